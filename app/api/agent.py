@@ -1,18 +1,40 @@
 """
 ReAct agent endpoint using DSPy Module classes
 """
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 import dspy
 
-from app.core import setup_logging, config
+from app.core import AppState, clock, setup_logging, config
+from app.api.responses import json_response
+from app.api.guards import require_text
 from app.models import AgentRequest, AgentResponse
-from app.tools import get_default_tools
+from app.services import run_module, stream_events, final_event, sse
+from app.tools import get_default_tools, lookup_joke, lookup_weather, is_joke_request, extract_weather_city
 
 logger = setup_logging()
 router = APIRouter()
 
 
+class JSONModePredict(dspy.Predict):
+    """
+    Predict that always formats and parses through JSONAdapter.
+
+    JSONAdapter.__call__ sends a response_format (the output fields' JSON schema,
+    or plain JSON mode if the provider rejects the schema), so the output comes
+    back as JSON. The override is set on the thread running the step and is
+    gone once it returns.
+    """
+
+    def __init__(self, signature, **kwargs):
+        super().__init__(signature, **kwargs)
+        self.adapter = dspy.JSONAdapter()
+
+    def forward(self, **kwargs):
+        with dspy.context(adapter=self.adapter):
+            return super().forward(**kwargs)
+
+
 class AgentModule(dspy.Module):
     """DSPy Module for ReAct agent with tools"""
     
@@ -23,79 +45,93 @@ class AgentModule(dspy.Module):
         self.react = dspy.ReAct(
             signature="user_request -> analysis_response",
             tools=tools,
-            max_iters=6
+            max_iters=config.AGENT_MAX_ITERS
         )
+        # Only tool selection is constrained to JSON; next_tool_name is already typed
+        # as a Literal over the tool names. The final extract step keeps the shared
+        # ChatAdapter, whose field markers the /agent/stream listener matches.
+        self.react.react = JSONModePredict(self.react.react.signature)
     
     def forward(self, user_request: str) -> dspy.Prediction:
+        # Obvious single-tool requests go straight to the tool, skipping the LM loop;
+        # if the tool fails, ReAct gets the request instead of the error message
+        if is_joke_request(user_request):
+            joke, ok = lookup_joke()
+            if ok:
+                return dspy.Prediction(analysis_response=joke)
+        else:
+            city = extract_weather_city(user_request)
+            if city:
+                weather, ok = lookup_weather(city)
+                if ok:
+                    return dspy.Prediction(analysis_response=weather)
+        
         return self.react(user_request=user_request)
 
 
-# Global module instance
-_agent_module: AgentModule = None
-_configured = False
-
-
-def _ensure_configured():
-    """Ensure DSPy is configured"""
-    global _configured, _agent_module
-    
-    if _configured:
-        return
-    
+def configure_modules(state: AppState):
+    """Build the agent module into the app state"""
     if not config.is_configured:
-        _configured = True
         return
     
     try:
-        # Configure DSPy
-        # lm = dspy.LM(
-        #     model=config.DEFAULT_MODEL,
-        #     api_key=config.GROQ_API_KEY,
-        #     max_tokens=config.DEFAULT_MAX_TOKENS,
-        #     temperature=config.DEFAULT_TEMPERATURE
-        # )
-        # dspy.configure(lm=lm)
-        
         # Initialize agent module with tools
-        tools = get_default_tools()
-        _agent_module = AgentModule(tools)
-        _configured = True
+        state.agent_module = AgentModule(get_default_tools())
         logger.info("Agent module configured successfully with weather and joke tools")
         
     except Exception as e:
         logger.error(f"Failed to configure agent module: {e}")
-        _configured = True
 
 
 @router.post("/agent", response_model=AgentResponse)
-async def agent_chat(request: AgentRequest):
+async def agent_chat(request: AgentRequest, http_request: Request):
     """
     ReAct agent using DSPy AgentModule with tools.
     Best for: Tasks requiring tools (weather, jokes), reasoning + acting, complex interactions.
     """
-    _ensure_configured()
+    require_text(request.message, "message")
     
     if not config.is_configured:
-        return AgentResponse(
+        return json_response(AgentResponse(
             response="Service not configured. Please set GROQ_API_KEY.",
             message=request.message,
-            timestamp=datetime.now(),
+            timestamp=clock.now(),
             model_used="Not configured"
-        )
+        ))
     
-    if not _agent_module:
+    state: AppState = http_request.app.state.runtime
+    if not state.agent_module:
         raise HTTPException(status_code=500, detail="Agent module not initialized")
     
     try:
         # Use DSPy AgentModule for tool-based reasoning
-        result = _agent_module(user_request=request.message)
+        result = await run_module(state.agent_module, user_request=request.message)
         
-        return AgentResponse(
+        return json_response(AgentResponse(
             response=getattr(result, "analysis_response", str(result)),
             message=request.message,
-            timestamp=datetime.now(),
+            timestamp=clock.now(),
             model_used="DSPy AgentModule (ReAct with Tools)",
-        )
+        ))
     except Exception as e:
         logger.error(f"Agent error: {e}")
         raise HTTPException(status_code=500, detail=f"Agent processing failed: {str(e)}")
+
+
+@router.post("/agent/stream")
+async def agent_chat_stream(request: AgentRequest, http_request: Request):
+    """
+    ReAct agent streamed as server-sent events.
+    Emits tool-call status updates and response tokens as they happen, then the full prediction.
+    """
+    require_text(request.message, "message")
+    
+    module = http_request.app.state.runtime.agent_module
+    if not config.is_configured:
+        events = final_event(analysis_response="Service not configured. Please set GROQ_API_KEY.")
+    elif not module:
+        raise HTTPException(status_code=500, detail="Agent module not initialized")
+    else:
+        events = stream_events(module, ("analysis_response",), user_request=request.message)
+    
+    return StreamingResponse(sse(events), media_type="text/event-stream")
@@ -1,27 +1,32 @@
 
+import asyncio
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import diskcache
 import dspy
-import pandas as pd
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
-from app.core import config, setup_logging
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from app.core import clock, config, setup_logging
+from app.api.responses import json_response
+from app.api.guards import require_text
 from app.models.finetuning_schemas import TrainingResponse, PredictionRequest, PredictionResponse
+from app.services import ParallelBootstrapFewShot, response_cache, response_key, run_module
 
 logger = setup_logging()
 router = APIRouter()
 
-# lm = dspy.LM(
-#     api_key=config.GROQ_API_KEY,
-#     model=config.DEFAULT_MODEL,
-#     temperature=config.DEFAULT_TEMPERATURE,
-#     max_tokens=config.DEFAULT_MAX_TOKENS
-# )
-# dspy.configure(lm=lm)
-
 TRAIN_DATA_DIR = Path("train-data")
+QA_ARTIFACT_PATH = Path(config.QA_ARTIFACT_PATH)
 
 # Global variable to store the optimized model
 optimized_qa = None
+# Version of the artifact optimized_qa was loaded from; see _artifact_version
+_loaded_version = None
+
+# Training job records live on disk so any worker can answer a status poll
+_training_jobs = diskcache.Cache(os.path.join(config.QA_CACHE_DIR, "jobs"))
+TRAINING_JOB_TTL = 24 * 60 * 60
 
 
 class QA(dspy.Signature):
@@ -30,67 +35,196 @@ class QA(dspy.Signature):
     answer = dspy.OutputField(desc="Answer to the question")
 
 
+# Shared by every training example; dspy only ever reads an example's input keys
+_INPUT_KEYS = frozenset({"question"})
+
+
+def _make_example(question: str, answer: str) -> dspy.Example:
+    """Build a training example without the copy that with_inputs makes"""
+    example = dspy.Example(question=question, answer=answer)
+    example._input_keys = _INPUT_KEYS
+    return example
+
+
+def _cache_key(question: str, program: dspy.Module, version) -> str:
+    """Build the prediction cache key for a question answered by one artifact version"""
+    return response_key(
+        "predict", program, dspy.settings.lm, question=question.strip().lower(), artifact=version
+    )
+
+
+def _artifact_version():
+    """
+    Identify the saved artifact, or None if there is none.
+    Every save renames a new file into place, so the inode changes with each one.
+    """
+    try:
+        stat = QA_ARTIFACT_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_ino}-{stat.st_mtime_ns}"
+
+
+def save_optimized_model(program: dspy.Module):
+    """Persist the compiled program so other workers and restarts can reuse it"""
+    QA_ARTIFACT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so concurrent workers never read a half-written file
+    tmp_path = QA_ARTIFACT_PATH.with_name(f"{QA_ARTIFACT_PATH.stem}.{os.getpid()}.tmp.json")
+    program.save(str(tmp_path))
+    os.replace(tmp_path, QA_ARTIFACT_PATH)
+    logger.info(f"Saved optimized QA model to {QA_ARTIFACT_PATH}")
+    return _artifact_version()
+
+
+def load_optimized_model():
+    """Restore the last compiled program from disk, if there is one"""
+    global optimized_qa, _loaded_version
+    
+    version = _artifact_version()
+    if version is None:
+        return
+    
+    try:
+        program = dspy.Predict(QA)
+        program.load(str(QA_ARTIFACT_PATH))
+        optimized_qa, _loaded_version = program, version
+        logger.info(f"Loaded optimized QA model from {QA_ARTIFACT_PATH}")
+    except Exception as e:
+        logger.error(f"Failed to load optimized QA model: {e}")
+
+
+def _read_csv(csv_file: Path):
+    """Read one training CSV, returning the exception instead of raising"""
+    import pandas as pd
+
+    try:
+        # dtype=str skips pandas' type inference pass; usecols keeps extra columns
+        # from shifting the question into the index
+        return pd.read_csv(
+            csv_file, header=None, names=["question", "answer"], usecols=[0, 1], dtype=str, engine="c"
+        )
+    except Exception as e:
+        return e
+
+
 def load_training_data():
     """Load all CSV files from train-data directory"""
+    # pandas is only needed for training; importing it here keeps worker boot fast
+    import pandas as pd
+
     if not TRAIN_DATA_DIR.exists():
         TRAIN_DATA_DIR.mkdir(exist_ok=True)
         logger.info(f"Created train-data directory at {TRAIN_DATA_DIR}")
     
-    trainlist = []
+    frames = []
     processed_files = []
     
-    for csv_file in TRAIN_DATA_DIR.glob("*.csv"):
-        try:
-            df = pd.read_csv(csv_file, header=None)
-            if not df.empty:
-                for question, answer in df.values:
-                    trainlist.append(dspy.Example(question=question, answer=answer).with_inputs("question"))
+    with os.scandir(TRAIN_DATA_DIR) as entries:
+        csv_files = [Path(entry.path) for entry in entries if entry.name.endswith(".csv") and entry.is_file()]
+    # The C parser releases the GIL, so files are read concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(csv_files) or 1)) as executor:
+        for csv_file, result in zip(csv_files, executor.map(_read_csv, csv_files)):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {csv_file.name}: {result}")
+            elif not result.empty:
+                frames.append(result)
                 processed_files.append(csv_file.name)
-                logger.info(f"Processed {csv_file.name}: {len(df)} examples")
-        except Exception as e:
-            logger.error(f"Error processing {csv_file.name}: {e}")
+                logger.info(f"Processed {csv_file.name}: {len(result)} examples")
+    
+    if not frames:
+        return [], processed_files
+    
+    all_df = pd.concat(frames, ignore_index=True)
+    trainlist = list(map(_make_example, all_df["question"], all_df["answer"]))
     
     return trainlist, processed_files
 
 
-@router.post("/train", response_model=TrainingResponse)
-async def train_model():
-    """Train the model using all CSV files in the train-data directory"""
-    global optimized_qa
+def _run_training(job_id: str, trainlist: list, processed_files: list):
+    """Compile and persist the QA program, recording the outcome under job_id"""
+    global optimized_qa, _loaded_version
     
+    record = {"files_processed": processed_files, "examples_count": len(trainlist), "job_id": job_id}
     try:
-        trainlist, processed_files = load_training_data()
-        print(trainlist,processed_files)
-        
-        if not trainlist:
-            raise HTTPException(
-                status_code=404,
-                detail="No training data found in train-data directory"
-            )
-        
         # Create and optimize the model
         qa_module = dspy.Predict(QA)
-        optimizer = dspy.BootstrapFewShot()
-        optimized_qa = optimizer.compile(student=qa_module, trainset=trainlist)
-        
-        return TrainingResponse(
-            files_processed=processed_files,
-            examples_count=len(trainlist),
-            status="success",
-            timestamp=datetime.now()
+        # Teacher calls run concurrently and stop once enough demos succeed
+        optimizer = ParallelBootstrapFewShot(
+            num_threads=config.TRAIN_NUM_THREADS,
+            max_bootstrapped_demos=config.TRAIN_MAX_BOOTSTRAPPED_DEMOS,
+            max_labeled_demos=config.TRAIN_MAX_LABELED_DEMOS,
         )
+        program = optimizer.compile(student=qa_module, trainset=trainlist)
+        version = save_optimized_model(program)
+        # Swapped together and only once saved, so cache keys always name the program served
+        optimized_qa, _loaded_version = program, version
+        # Keys carry the artifact version, so this only frees the old model's entries
+        response_cache.evict("predict")
+        record["status"] = "success"
         
+    except Exception as e:
+        logger.error(f"Training error: {e}")
+        record.update(status="failed", error=str(e))
+    
+    record["timestamp"] = clock.now()
+    _training_jobs.set(job_id, record, expire=TRAINING_JOB_TTL)
+
+
+@router.post("/train", response_model=TrainingResponse)
+async def train_model(background_tasks: BackgroundTasks):
+    """
+    Start training on all CSV files in the train-data directory.
+    Compilation runs in the background; poll /train/status/{job_id} for the result.
+    """
+    try:
+        trainlist, processed_files = await asyncio.to_thread(load_training_data)
     except Exception as e:
         logger.error(f"Training error: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Training failed: {str(e)}"
         )
+    
+    if not trainlist:
+        raise HTTPException(
+            status_code=404,
+            detail="No training data found in train-data directory"
+        )
+    
+    job_id = uuid.uuid4().hex
+    record = {
+        "files_processed": processed_files,
+        "examples_count": len(trainlist),
+        "status": "running",
+        "timestamp": clock.now(),
+        "job_id": job_id,
+    }
+    _training_jobs.set(job_id, record, expire=TRAINING_JOB_TTL)
+    # Sync background tasks run in the threadpool, off the event loop
+    background_tasks.add_task(_run_training, job_id, trainlist, processed_files)
+    
+    return json_response(TrainingResponse(**(record | {"status": "accepted"})))
+
+
+@router.get("/train/status/{job_id}", response_model=TrainingResponse)
+async def training_status(job_id: str):
+    """Get the status of a training job started by /train"""
+    record = _training_jobs.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job: {job_id}")
+    return json_response(TrainingResponse(**record))
 
 
 @router.post("/predict", response_model=PredictionResponse)
 async def get_prediction(request: PredictionRequest):
     """Get a prediction for a question using the trained model"""
+    require_text(request.question, "question")
+    
+    # Another worker may have trained since this one loaded the artifact
+    version = _artifact_version()
+    if version is not None and version != _loaded_version:
+        await asyncio.to_thread(load_optimized_model)
+    
     if not optimized_qa:
         raise HTTPException(
             status_code=400,
@@ -98,12 +232,18 @@ async def get_prediction(request: PredictionRequest):
         )
     
     try:
-        result = optimized_qa(question=request.question)
-        return PredictionResponse(
+        key = _cache_key(request.question, optimized_qa, _loaded_version)
+        answer = response_cache.get(key)
+        if answer is None:
+            result = await run_module(optimized_qa, question=request.question)
+            answer = result.answer
+            response_cache.set(key, answer, tag="predict")
+
+        return json_response(PredictionResponse(
             question=request.question,
-            answer=result.answer,
-            timestamp=datetime.now()
-        )
+            answer=answer,
+            timestamp=clock.now()
+        ))
         
     except Exception as e:
         logger.error(f"Prediction error: {e}")
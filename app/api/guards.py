@@ -0,0 +1,24 @@
+"""
+Request guards that reject unusable input before it reaches the LM
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core import config
+
+
+def limit_text(value: Optional[str], field: str):
+    """Reject text longer than MAX_INPUT_CHARS"""
+    if value and len(value) > config.MAX_INPUT_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{field} must be at most {config.MAX_INPUT_CHARS} characters"
+        )
+
+
+def require_text(value: Optional[str], field: str):
+    """Reject empty, whitespace-only or oversized text"""
+    if not value or not value.strip():
+        raise HTTPException(status_code=422, detail=f"{field} must be non-empty")
+    limit_text(value, field)
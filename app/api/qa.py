@@ -1,30 +1,49 @@
 """
 Question answering and reasoning endpoints using DSPy Module classes
 """
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 import dspy
 
-from app.core import setup_logging, config
+from app.core import AppState, clock, setup_logging, config
+from app.api.responses import json_response
+from app.api.guards import limit_text, require_text
 from app.models import QuestionRequest, QuestionResponse
+from app.services import (
+    SemanticCache, response_cache, response_key,
+    run_module, stream_events, final_event, ndjson, sse
+)
+from app.services.embeddings import encode
 
 logger = setup_logging()
 router = APIRouter()
 
 
 
+# Signatures live at module scope so every call renders the same prompt prefix
+class QuestionSignature(dspy.Signature):
+    """Simple question answering"""
+    # Context before question: requests sharing a context share a longer prompt prefix
+    context = dspy.InputField(desc="Optional context to help answer")
+    question = dspy.InputField(desc="User question")
+    answer = dspy.OutputField(desc="response as intents and entities")
+
+
+class ReasoningSignature(dspy.Signature):
+    """Question answering with step-by-step reasoning and context"""
+    context = dspy.InputField(desc="Optional context to help reasoning")
+    question = dspy.InputField(desc="user input")
+    reasoning = dspy.OutputField(desc="Step-by-step reasoning process")
+    answer = dspy.OutputField(desc="intents and entities of the user input")
+
+
 class QuestionModule(dspy.Module):
     """DSPy Module for simple question answering"""
     
     def __init__(self):
         super().__init__()
-        
-        class QuestionSignature(dspy.Signature):
-            """Simple question answering"""
-            question = dspy.InputField(desc="User question")
-            context = dspy.InputField(desc="Optional context to help answer")
-            answer = dspy.OutputField(desc="response as intents and entities")
-        
         self.predict = dspy.Predict(QuestionSignature)
     
     def forward(self, question: str,context: str=None) -> dspy.Prediction:
@@ -36,85 +55,87 @@ class ReasoningModule(dspy.Module):
     
     def __init__(self):
         super().__init__()
-        class ReasoningSignature(dspy.Signature):
-            """Question answering with step-by-step reasoning and context"""
-            question = dspy.InputField(desc="user input")
-            context = dspy.InputField(desc="Optional context to help reasoning")
-            reasoning = dspy.OutputField(desc="Step-by-step reasoning process")
-            answer = dspy.OutputField(desc="intents and entities of the user input")
         self.cot = dspy.ChainOfThought(ReasoningSignature)
 
     def forward(self, question: str, context: str = None) -> dspy.Prediction:
         return self.cot(question=question, context=context)
 
 
-# Global module instances
-_question_module: QuestionModule = None
-_reasoning_module: ReasoningModule = None
-_configured = False
+# Paraphrased repeats are answered from embedding-similarity caches
+_question_cache = SemanticCache(encode, config.SEMANTIC_CACHE_THRESHOLD, config.SEMANTIC_CACHE_SIZE)
+_reasoning_cache = SemanticCache(encode, config.SEMANTIC_CACHE_THRESHOLD, config.SEMANTIC_CACHE_SIZE)
 
 
-def _ensure_configured():
-    """Ensure DSPy is configured"""
-    global _configured, _question_module, _reasoning_module
-    
-    if _configured:
-        return
-    
+async def _cache_vector(cache: SemanticCache, request: QuestionRequest):
+    """Embed the request off the event loop, or None when caching is disabled"""
+    if not config.SEMANTIC_CACHE_ENABLED:
+        return None
+    return await asyncio.to_thread(cache.encode, f"{request.question}\n{request.context or ''}")
+
+
+def configure_modules(state: AppState):
+    """Build the QA modules into the app state"""
     if not config.is_configured:
-        _configured = True
         return
     
     try:
-        # Configure DSPy
-        # lm = dspy.LM(
-        #     model=config.DEFAULT_MODEL,
-        #     api_key=config.GROQ_API_KEY,
-        #     max_tokens=config.DEFAULT_MAX_TOKENS,
-        #     temperature=config.DEFAULT_TEMPERATURE
-        # )
-        # dspy.configure(lm=lm)
-        
-        # Initialize modules
-        _question_module = QuestionModule()
-        _reasoning_module = ReasoningModule()
-        _configured = True
+        state.question_module = QuestionModule()
+        state.reasoning_module = ReasoningModule()
         logger.info("QA modules configured successfully")
         
     except Exception as e:
         logger.error(f"Failed to configure QA modules: {e}")
-        _configured = True
 
 
 @router.post("/question", response_model=QuestionResponse)
-async def question_answering(request: QuestionRequest):
+async def question_answering(request: QuestionRequest, http_request: Request):
     """
     Direct question answering using DSPy QuestionModule.
     Best for: Simple Q&A, factual questions, quick answers.
     """
-    _ensure_configured()
+    require_text(request.question, "question")
+    limit_text(request.context, "context")
     
     if not config.is_configured:
-        return QuestionResponse(
+        return json_response(QuestionResponse(
             question=request.question,
             answer="Service not configured. Please set GROQ_API_KEY.",
-            timestamp=datetime.now()
-        )
+            timestamp=clock.now()
+        ))
     
-    if not _question_module:
+    state: AppState = http_request.app.state.runtime
+    if not state.question_module:
         raise HTTPException(status_code=500, detail="Question module not initialized")
     
     try:
-        # Use QuestionModule for direct questions
-        result = _question_module(question=request.question,context=request.context)
-        print(dspy.inspect_history(n=1))
+        # Exact repeats skip both the embedding and the LM
+        key = response_key(
+            "question", state.question_module, state.lm,
+            question=request.question, context=request.context
+        )
+        answer = response_cache.get(key)
+        
+        if answer is None:
+            vector = await _cache_vector(_question_cache, request)
+            answer = _question_cache.get(vector) if vector is not None else None
+            
+            if answer is None:
+                # Use QuestionModule for direct questions
+                result = await run_module(
+                    state.question_module, question=request.question, context=request.context
+                )
+                answer = result.answer
+                if vector is not None:
+                    _question_cache.add(vector, answer)
+                # Only the LM's own answer is exact for this input, never a paraphrase's
+                response_cache.set(key, answer, tag="question")
         
-        return QuestionResponse(
+        return json_response(QuestionResponse(
             question=request.question,
             context=request.context,
-            answer=result.answer,
-            timestamp=datetime.now()
-        )
+            answer=answer,
+            timestamp=clock.now()
+        ))
         
     except Exception as e:
         logger.error(f"Question answering error: {e}")
@@ -122,35 +143,108 @@ async def question_answering(request: QuestionRequest):
 
 
 @router.post("/reasoning", response_model=QuestionResponse)
-async def chain_of_thought_reasoning(request: QuestionRequest):
+async def chain_of_thought_reasoning(request: QuestionRequest, http_request: Request):
     """
     Chain of thought reasoning using DSPy ReasoningModule.
     Best for: Complex problems, step-by-step analysis, detailed explanations.
     """
-    _ensure_configured()
+    require_text(request.question, "question")
+    limit_text(request.context, "context")
     
     if not config.is_configured:
-        return QuestionResponse(
+        return json_response(QuestionResponse(
             question=request.question,
             answer="Service not configured. Please set GROQ_API_KEY.",
-            timestamp=datetime.now()
-        )
+            timestamp=clock.now()
+        ))
     
-    if not _reasoning_module:
+    state: AppState = http_request.app.state.runtime
+    if not state.reasoning_module:
         raise HTTPException(status_code=500, detail="Reasoning module not initialized")
     
     try:
-        # Use ReasoningModule for detailed reasoning
-        result = _reasoning_module(question=request.question,context=request.context)
+        key = response_key(
+            "reasoning", state.reasoning_module, state.lm,
+            question=request.question, context=request.context
+        )
+        cached = response_cache.get(key)
         
-        return QuestionResponse(
+        if cached is None:
+            vector = await _cache_vector(_reasoning_cache, request)
+            cached = _reasoning_cache.get(vector) if vector is not None else None
+            
+            if cached is None:
+                # Use ReasoningModule for detailed reasoning
+                result = await run_module(
+                    state.reasoning_module, question=request.question, context=request.context
+                )
+                cached = (result.answer, result.reasoning)
+                if vector is not None:
+                    _reasoning_cache.add(vector, cached)
+                response_cache.set(key, cached, tag="reasoning")
+        
+        answer, reasoning = cached
+        return json_response(QuestionResponse(
             question=request.question,
             context = request.context,
-            answer=result.answer,
-            reasoning=result.reasoning,
-            timestamp=datetime.now()
-        )
+            answer=answer,
+            reasoning=reasoning,
+            timestamp=clock.now()
+        ))
         
     except Exception as e:
         logger.error(f"Reasoning error: {e}")
         raise HTTPException(status_code=500, detail=f"Reasoning processing failed: {str(e)}")
+
+
+def _stream_response(events, http_request: Request) -> StreamingResponse:
+    """Server-sent events when the client asks for them, newline-delimited JSON otherwise"""
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        return StreamingResponse(sse(events), media_type="text/event-stream")
+    return StreamingResponse(ndjson(events), media_type="application/x-ndjson")
+
+
+@router.post("/question/stream")
+async def question_answering_stream(request: QuestionRequest, http_request: Request):
+    """
+    Direct question answering streamed token by token.
+    Emits answer tokens as they are generated, then the full prediction.
+    """
+    require_text(request.question, "question")
+    limit_text(request.context, "context")
+    
+    module = http_request.app.state.runtime.question_module
+    if not config.is_configured:
+        events = final_event(answer="Service not configured. Please set GROQ_API_KEY.")
+    elif not module:
+        raise HTTPException(status_code=500, detail="Question module not initialized")
+    else:
+        events = stream_events(
+            module, ("answer",),
+            question=request.question, context=request.context
+        )
+    
+    return _stream_response(events, http_request)
+
+
+@router.post("/reasoning/stream")
+async def chain_of_thought_reasoning_stream(request: QuestionRequest, http_request: Request):
+    """
+    Chain of thought reasoning streamed token by token.
+    Emits reasoning and answer tokens as they are generated, then the full prediction.
+    """
+    require_text(request.question, "question")
+    limit_text(request.context, "context")
+    
+    module = http_request.app.state.runtime.reasoning_module
+    if not config.is_configured:
+        events = final_event(answer="Service not configured. Please set GROQ_API_KEY.")
+    elif not module:
+        raise HTTPException(status_code=500, detail="Reasoning module not initialized")
+    else:
+        events = stream_events(
+            module, ("reasoning", "answer"),
+            question=request.question, context=request.context
+        )
+    
+    return _stream_response(events, http_request)
@@ -0,0 +1,16 @@
+"""
+Response helpers for the API endpoints
+"""
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def json_response(model: BaseModel, status_code: int = 200) -> ORJSONResponse:
+    """
+    Serialize an already-validated response model straight to orjson.
+
+    Returning a Response skips FastAPI's response_model pass, which would
+    otherwise dump, re-validate and re-encode the model a second time. The
+    route's response_model still documents the schema in OpenAPI.
+    """
+    return ORJSONResponse(model.model_dump(), status_code=status_code)
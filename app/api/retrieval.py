@@ -1,57 +1,76 @@
 """
 RAG (Retrieval-Augmented Generation) endpoint using DSPy Module classes
 """
-from datetime import datetime
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import os
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException
 import dspy
+import numpy as np
 from pathlib import Path
 from docx import Document
-from sentence_transformers import SentenceTransformer
 import re
 
-from app.core import setup_logging, config
+from app.core import clock, setup_logging, config
+from app.api.responses import json_response
+from app.api.guards import require_text
 from app.models import RAGRequest, RAGResponse
+from app.services import KeywordIndex
+from app.services.embeddings import CachedEmbeddings, embed
+from app.services.keyword_index import tokenize, top_k_indices
 
 logger = setup_logging()
 router = APIRouter()
 
 # --- Advanced DOCX Chunking ---
-def read_docx_with_chunks(filepath, chunk_size=500, overlap=100):
-    doc = Document(filepath)
-    all_text = []
-    for p in doc.paragraphs:
-        if p.text.strip():
-            all_text.append(p.text.strip())
+def _docx_texts(doc):
+    """Paragraph texts, then table rows, in document order"""
+    # python-docx rebuilds .text from the XML runs on every access, so read it once
+    yield from (p.text for p in doc.paragraphs)
     for table in doc.tables:
         for row in table.rows:
-            row_text = " | ".join([cell.text.strip() for cell in row.cells if cell.text.strip()])
-            if row_text:
-                all_text.append(row_text)
-    full_text = "\n".join(all_text)
-    chunks = []
-    words = full_text.split()
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        if chunk.strip():
-            chunks.append(chunk)
-    return chunks
-
-# --- Embedding Model ---
-def get_better_embedder():
-    return SentenceTransformer("all-mpnet-base-v2")
+            yield " | ".join(text for text in (cell.text.strip() for cell in row.cells) if text)
+
+def read_docx_with_chunks(filepath, chunk_size=500, overlap=100):
+    """
+    Yield overlapping word windows over the document without building its full text.
+    Same chunks as splitting the joined text: a window every chunk_size - overlap words.
+    """
+    # A window that does not advance would never drain the buffer
+    if not 0 <= overlap < chunk_size:
+        raise ValueError(f"overlap must be in [0, chunk_size), got overlap={overlap}, chunk_size={chunk_size}")
+    doc = Document(filepath)
+    step = chunk_size - overlap
+    buf = []
+    for text in _docx_texts(doc):
+        buf.extend(text.split())
+        while len(buf) >= chunk_size:
+            yield " ".join(buf[:chunk_size])
+            del buf[:step]
+    # Trailing windows are shorter than chunk_size
+    while buf:
+        yield " ".join(buf)
+        del buf[:step]
 
 # --- Query Enhancement ---
+DOMAIN_KEYWORDS = {
+    'roaming': ['international', 'travel', 'abroad', 'foreign', 'outside'],
+    'extend': ['renewal', 'prolonge', 'continue', 'activate'],
+    'date': ['until', 'till', 'expire', 'expiry', 'period'],
+    'vodafone': ['network', 'service', 'plan', 'package']
+}
+# (keyword, text appended when it appears), built once instead of on every query
+_QUERY_EXPANSIONS = tuple(
+    (key, f" {' '.join(synonyms[:2])}") for key, synonyms in DOMAIN_KEYWORDS.items()
+)
+
 def enhance_query(question: str) -> str:
-    domain_keywords = {
-        'roaming': ['international', 'travel', 'abroad', 'foreign', 'outside'],
-        'extend': ['renewal', 'prolonge', 'continue', 'activate'],
-        'date': ['until', 'till', 'expire', 'expiry', 'period'],
-        'vodafone': ['network', 'service', 'plan', 'package']
-    }
     enhanced = question.lower()
-    for key, synonyms in domain_keywords.items():
+    for key, expansion in _QUERY_EXPANSIONS:
         if key in enhanced:
-            enhanced += f" {' '.join(synonyms[:2])}"
+            enhanced += expansion
     return enhanced
 
 # --- Prepare Corpus from all DOCX files in docs/ ---
@@ -60,86 +79,111 @@ def build_corpus_from_docx(docs_dir="docs", chunk_size=300, overlap=50):
     corpus = []
     if not docs_path.exists():
         docs_path.mkdir(exist_ok=True)
-    for docx_file in docs_path.glob("*.docx"):
+    # scandir entries carry their file type, so no extra stat per file
+    with os.scandir(docs_path) as entries:
+        docx_files = [entry for entry in entries if entry.name.endswith(".docx") and entry.is_file()]
+    def read_one(docx_file):
         try:
-            docx_chunks = read_docx_with_chunks(str(docx_file), chunk_size=chunk_size, overlap=overlap)
-            corpus.extend(docx_chunks)
-            logger.info(f"Loaded {len(docx_chunks)} chunks from {docx_file.name}")
+            return list(read_docx_with_chunks(docx_file.path, chunk_size=chunk_size, overlap=overlap))
         except Exception as e:
-            logger.error(f"Error loading {docx_file.name}: {e}")
+            return e
+    # Unzipping and XML parsing release the GIL for long stretches, so files load concurrently;
+    # map keeps the corpus in directory order
+    with ThreadPoolExecutor(max_workers=min(32, len(docx_files) or 1)) as executor:
+        for docx_file, result in zip(docx_files, executor.map(read_one, docx_files)):
+            if isinstance(result, Exception):
+                logger.error(f"Error loading {docx_file.name}: {result}")
+            else:
+                corpus.extend(result)
+                logger.info(f"Loaded {len(result)} chunks from {docx_file.name}")
     return corpus
 
 corpus = build_corpus_from_docx()
-hf_model = get_better_embedder()
-
-# --- Embedding Function ---
-def improved_embed(texts):
-    if isinstance(texts, str):
-        texts = [texts]
-    embeddings = hf_model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
-    return embeddings.tolist()
 
 # --- Custom Retriever ---
 class ImprovedRetriever:
     def __init__(self, embedder, corpus, k=5):
-        self.base_retriever = dspy.retrievers.Embeddings(
+        self.base_retriever = CachedEmbeddings(
             embedder=embedder,
             corpus=corpus,
             k=k*2
         )
         self.corpus = corpus
         self.k = k
+        # Token sets are built once here; only the query is tokenized per call
+        self.doc_tokens = [frozenset(tokenize(doc)) for doc in corpus]
+        # Per instance, so a reload (which builds a new retriever) starts cold
+        self._retrieve_cached = lru_cache(maxsize=1024)(self._retrieve)
     def __call__(self, query):
+        return list(self._retrieve_cached(query))
+    def _retrieve(self, query):
         enhanced_query = enhance_query(query)
         initial_results = self.base_retriever(enhanced_query)
-        scored_results = []
-        query_words = set(query.lower().split())
-        for doc in initial_results:
-            doc_words = set(doc.lower().split())
-            exact_matches = len(query_words.intersection(doc_words))
-            scored_results.append((exact_matches, doc))
-        scored_results.sort(key=lambda x: x[0], reverse=True)
-        return [doc for score, doc in scored_results[:self.k]]
+        query_words = set(tokenize(query))
+        indices = initial_results.indices
+        scores = np.fromiter(
+            (len(query_words & self.doc_tokens[idx]) for idx in indices), dtype=np.int64, count=len(indices)
+        )
+        # Ties keep the semantic order
+        return tuple(self.corpus[indices[i]] for i in top_k_indices(scores, self.k))
 
 retriever = ImprovedRetriever(
-    embedder=improved_embed,
+    embedder=embed,
     corpus=corpus,
     k=3
 )
 
 class ImprovedRAGSignature(dspy.Signature):
     """Answer questions about Vodafone telecommunication services using retrieved context."""
-    question = dspy.InputField(desc="User question about Vodafone services (roaming, plans, etc.)")
+    # Retrieved context leads, so queries hitting the same chunks share a prompt prefix
     context = dspy.InputField(desc="Relevant information from Vodafone documentation")
+    question = dspy.InputField(desc="User question about Vodafone services (roaming, plans, etc.)")
     answer = dspy.OutputField(desc="Helpful and accurate answer based on the context. If extending roaming, provide specific steps and requirements.")
 
+_WS_RE = re.compile(r'\s+')
+
+@lru_cache(maxsize=1024)
+def format_context(docs):
+    """Numbered, whitespace-normalized context; hot document sets are formatted once"""
+    context_parts = []
+    for i, doc in enumerate(docs, 1):
+        clean_doc = _WS_RE.sub(' ', doc.strip())
+        context_parts.append(f"[Source {i}]: {clean_doc}")
+    return "\n\n".join(context_parts)
+
 class HybridRAG(dspy.Module):
-    def __init__(self):
+    def __init__(self, retriever, corpus):
         super().__init__()
         self.semantic_retrieve = retriever
         self.answer = dspy.Predict(ImprovedRAGSignature)
+        # BM25, the same scorer test2.py's HybridRAG uses
+        self.keyword_index = KeywordIndex(corpus)
     def keyword_search(self, question, top_k=2):
-        question_words = question.lower().split()
-        scored_docs = []
-        for doc in corpus:
-            doc_lower = doc.lower()
-            score = sum(doc_lower.count(word) for word in question_words)
-            if score > 0:
-                scored_docs.append((score, doc))
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
-        return [doc for score, doc in scored_docs[:top_k]]
-    def forward(self, question):
+        return self.keyword_index.search(question, top_k=top_k)
+    def build_context(self, question):
         semantic_docs = self.semantic_retrieve(question)
         keyword_docs = self.keyword_search(question)
-        all_docs = semantic_docs + [doc for doc in keyword_docs if doc not in semantic_docs]
-        context_parts = []
-        for i, doc in enumerate(all_docs[:4], 1):
-            clean_doc = re.sub(r'\s+', ' ', doc.strip())
-            context_parts.append(f"[Source {i}]: {clean_doc}")
-        context = "\n\n".join(context_parts)
-        return self.answer(context=context, question=question)
+        # Set membership, not a scan of semantic_docs per keyword hit
+        seen = set(semantic_docs)
+        all_docs = semantic_docs + [doc for doc in keyword_docs if doc not in seen]
+        return format_context(tuple(all_docs[:4]))
+    def forward(self, question):
+        return self.answer(context=self.build_context(question), question=question)
+
+rag_hybrid = HybridRAG(retriever, corpus)
 
-rag_hybrid = HybridRAG()
+
+def _build_rag():
+    """Corpus, retriever and HybridRAG over the current docs/; every step is CPU or disk bound"""
+    new_corpus = build_corpus_from_docx()
+    new_retriever = ImprovedRetriever(embedder=embed, corpus=new_corpus, k=3)
+    return new_corpus, new_retriever, HybridRAG(new_retriever, new_corpus)
+
+# Answers depend only on the query while the corpus is unchanged
+_rag_answers = TTLCache(maxsize=config.RAG_CACHE_SIZE, ttl=config.RAG_CACHE_TTL)
+# Bumped by every reload; answers are keyed on it, so one computed on the old stack
+# by a request still in flight during a reload is never served afterwards
+_rag_generation = 0
 
 
 @router.post("/rag", response_model=RAGResponse)
@@ -147,15 +191,23 @@ async def rag_query(request: RAGRequest):
     """
     Retrieval-Augmented Generation using HybridRAG over all DOCX files in docs/.
     """
+    require_text(request.query, "query")
     try:
-        result = rag_hybrid(request.query)
-        print(request.query, result.answer)
-        return RAGResponse(
+        # Key and stack are read together, with no await in between
+        key, rag = (_rag_generation, request.query), rag_hybrid
+        answer = _rag_answers.get(key)
+        if answer is None:
+            # dspy.settings overrides are thread-local, so the program runs on its own thread, not the shared loop
+            result = await asyncio.to_thread(rag, question=request.query)
+            answer = result.answer
+            _rag_answers[key] = answer
+        logger.debug("RAG query=%r answer=%r", request.query, answer)
+        return json_response(RAGResponse(
             query=request.query,
-            response=result.answer,
+            response=answer,
             retrieved_docs=[],  # Optionally, you can return the top docs
-            timestamp=datetime.now()
-        )
+            timestamp=clock.now()
+        ))
     except Exception as e:
         logger.error(f"RAG error: {e}")
         raise HTTPException(status_code=500, detail=f"RAG processing failed: {str(e)}")
@@ -164,18 +216,17 @@ async def rag_query(request: RAGRequest):
 @router.post("/rag/reload")
 async def reload_documents():
     """Reload DOCX documents from the docs directory."""
-    global corpus, retriever, rag_hybrid
+    global corpus, retriever, rag_hybrid, _rag_generation
     try:
-        corpus = build_corpus_from_docx()
-        retriever = ImprovedRetriever(
-            embedder=improved_embed,
-            corpus=corpus,
-            k=3
-        )
-        rag_hybrid = HybridRAG()
+        # Build the whole stack off the loop, then swap it in with no await in between,
+        # so requests never see a half-reloaded state
+        new_stack = await asyncio.to_thread(_build_rag)
+        corpus, retriever, rag_hybrid = new_stack
+        _rag_generation += 1
+        _rag_answers.clear()
         return {
             "message": f"Successfully reloaded {len(corpus)} DOCX chunks",
-            "timestamp": datetime.now()
+            "timestamp": clock.now()
         }
     except Exception as e:
         logger.error(f"Document reload error: {e}")
@@ -191,7 +242,7 @@ async def rag_status():
             "rag_module_ready": True,
             "docx_chunk_count": len(corpus),
             "docs_directory": "docs/",
-            "timestamp": datetime.now()
+            "timestamp": clock.now()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,7 @@
 """
 File upload endpoint for training data
 """
+import aiofiles
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from pathlib import Path
 
@@ -9,14 +10,17 @@ router = APIRouter()
 TRAIN_DATA_DIR = Path("train-data")
 TRAIN_DATA_DIR.mkdir(exist_ok=True)
 
+# Uploads are streamed to disk in chunks of this size, never held in memory whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 @router.post("/upload-train-data")
 async def upload_train_data(file: UploadFile = File(...)):
     """Upload a file and store it in the train-data directory"""
     try:
         file_location = TRAIN_DATA_DIR / file.filename
-        with open(file_location, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        async with aiofiles.open(file_location, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
         return {"filename": file.filename, "message": "File uploaded successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
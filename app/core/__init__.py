@@ -1,7 +1,9 @@
 """
 Core module exports
 """
+from . import clock
 from .config import config
 from .logging import setup_logging
+from .state import AppState
 
-__all__ = ["config", "setup_logging"]
+__all__ = ["clock", "config", "setup_logging", "AppState"]
@@ -0,0 +1,45 @@
+"""
+Coarse wall clock for response timestamps
+"""
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+TICK_SECONDS = 0.05
+
+_now: datetime = datetime.now()
+_ticker: Optional[asyncio.Task] = None
+
+
+def now() -> datetime:
+    """Current time, refreshed every TICK_SECONDS while the ticker runs"""
+    if _ticker is None:
+        return datetime.now()
+    return _now
+
+
+async def _tick():
+    global _now
+    while True:
+        _now = datetime.now()
+        await asyncio.sleep(TICK_SECONDS)
+
+
+def start():
+    """Start refreshing the cached time on the running event loop"""
+    global _ticker, _now
+    if _ticker is None:
+        _now = datetime.now()
+        _ticker = asyncio.create_task(_tick())
+
+
+async def stop():
+    """Stop the ticker; now() falls back to datetime.now()"""
+    global _ticker
+    if _ticker is not None:
+        _ticker.cancel()
+        try:
+            await _ticker
+        except asyncio.CancelledError:
+            pass
+        _ticker = None
@@ -2,14 +2,16 @@
 Core configuration for DSPyBridge
 """
 import os
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Application configuration"""
+    """Application configuration, read from the environment once at import"""
     
     # Server settings
     APP_NAME: str = "DSPyBridge"
@@ -17,21 +19,76 @@ class Config:
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    # Each worker loads its own embedding model and thread pools, so one per core is the ceiling
+    WORKERS: int = int(os.getenv("WORKERS", str(os.cpu_count() or 1)))
+    # Torch intra-op threads per worker; the default splits the cores evenly between workers
+    TORCH_THREADS: int = int(os.getenv("TORCH_THREADS", str(max(1, (os.cpu_count() or 1) // WORKERS))))
+    BACKLOG: int = int(os.getenv("BACKLOG", "2048"))
+    LIMIT_CONCURRENCY: int = int(os.getenv("LIMIT_CONCURRENCY", "1024"))
+    UVICORN_LOOP: str = os.getenv("UVICORN_LOOP", "uvloop")
+    UVICORN_HTTP: str = os.getenv("UVICORN_HTTP", "httptools")
+    # "warning" and ACCESS_LOG=false take per-request logging off the hot path under load
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info").lower()
+    ACCESS_LOG: bool = os.getenv("ACCESS_LOG", "true").lower() == "true"
     
     # API Keys
     GROQ_API_KEY: Optional[str] = os.getenv("GROQ_API_KEY")
+    WEATHER_API_KEY: Optional[str] = os.getenv("WEATHER_API_KEY")
     
     # DSPy/LLM Configuration
     DEFAULT_MODEL: str = os.getenv("DEFAULT_MODEL", "groq/llama-3.1-8b-instant")
     DEFAULT_MAX_TOKENS: int = int(os.getenv("DEFAULT_MAX_TOKENS", "500"))
     DEFAULT_TEMPERATURE: float = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
+    LM_TIMEOUT: float = float(os.getenv("LM_TIMEOUT", "60"))
+    LM_MAX_CONNECTIONS: int = int(os.getenv("LM_MAX_CONNECTIONS", "256"))
+    LM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LM_MAX_KEEPALIVE_CONNECTIONS", "128"))
+    # One tiny uncached LM call per worker at startup, bounded by WARMUP_TIMEOUT seconds
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_TIMEOUT: float = float(os.getenv("WARMUP_TIMEOUT", "10"))
     AZURE_OPENAI_API_KEY: Optional[str] = os.getenv("AZURE_OPENAI_API_KEY")
     AZURE_OPENAI_DEPLOYMENT: Optional[str] = os.getenv("AZURE_OPENAI_DEPLOYMENT")
     AZURE_OPENAI_BASE_URL: Optional[str] = os.getenv("AZURE_OPENAI_BASE_URL")
     AZURE_OPENAI_VERSION: Optional[str] = os.getenv("AZURE_OPENAI_VERSION")
 
+    # Request limits
+    MAX_INPUT_CHARS: int = int(os.getenv("MAX_INPUT_CHARS", "8000"))
+
+    # Agent
+    AGENT_MAX_ITERS: int = int(os.getenv("AGENT_MAX_ITERS", "3"))
+
+    # Fine-tuning
+    TRAIN_MAX_BOOTSTRAPPED_DEMOS: int = int(os.getenv("TRAIN_MAX_BOOTSTRAPPED_DEMOS", "4"))
+    TRAIN_MAX_LABELED_DEMOS: int = int(os.getenv("TRAIN_MAX_LABELED_DEMOS", "16"))
+    # Teacher LM calls made at once while bootstrapping demos
+    TRAIN_NUM_THREADS: int = int(os.getenv("TRAIN_NUM_THREADS", "8"))
+    QA_ARTIFACT_PATH: str = os.getenv("QA_ARTIFACT_PATH", "artifacts/qa.json")
+
+    # Caching
+    QA_CACHE_DIR: str = os.getenv("QA_CACHE_DIR", ".qa_cache")
+    QA_CACHE_SIZE_LIMIT: int = int(os.getenv("QA_CACHE_SIZE_LIMIT", str(1 << 30)))
+    # Seconds an exact-match answer is kept; 0 keeps it until evicted
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    SEMANTIC_CACHE_SIZE: int = int(os.getenv("SEMANTIC_CACHE_SIZE", "10000"))
+
+    RAG_CACHE_SIZE: int = int(os.getenv("RAG_CACHE_SIZE", "1024"))
+    RAG_CACHE_TTL: float = float(os.getenv("RAG_CACHE_TTL", "300"))
+
+    # Embeddings
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-mpnet-base-v2")
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+    # Empty picks cuda, then mps, then cpu
+    EMBEDDING_DEVICE: str = os.getenv("EMBEDDING_DEVICE", "")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "128"))
+    # torch, onnx, openvino, or onnx-int8 (dynamically quantized ONNX on CPU; needs the onnx extra)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    # Corpora with at least this many chunks use a FAISS HNSW index (if faiss is installed)
+    EMBEDDING_ANN_THRESHOLD: int = int(os.getenv("EMBEDDING_ANN_THRESHOLD", "5000"))
+
     # CORS
-    ALLOWED_ORIGINS: list = ["*"]  # Configure for production
+    ALLOWED_ORIGINS: Tuple[str, ...] = ("*",)  # Configure for production
     
     @property
     def is_configured(self) -> bool:
@@ -1,22 +1,50 @@
 """
 Logging configuration
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+from typing import Optional
+
+from .config import config
+
+_LOGGER: Optional[logging.Logger] = None
 
 def setup_logging() -> logging.Logger:
-    """Configure logging for the application"""
-    
+    """
+    Configure logging for the application (once) and return its logger.
+
+    Records are handed to a queue; a listener thread formats them and writes
+    stdout, so a request path that logs never blocks on the stream.
+    """
+    global _LOGGER
+
+    if _LOGGER is not None:
+        return _LOGGER
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Drain what is still queued when the process exits
+    atexit.register(listener.stop)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Only %-args are merged here; timestamps and layout are applied on the listener thread
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
     logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
+        # LOG_LEVEL uses uvicorn's names; its "trace" has no stdlib level, so it maps to DEBUG
+        level=logging.getLevelNamesMapping().get(config.LOG_LEVEL.upper(), logging.DEBUG),
+        handlers=[queue_handler]
     )
-    
+
     # Suppress some noisy loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("httpcore").setLevel(logging.WARNING)
-    
-    return logging.getLogger("dspybridge")
+
+    _LOGGER = logging.getLogger("dspybridge")
+    return _LOGGER
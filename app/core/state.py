@@ -0,0 +1,17 @@
+"""
+Per-app runtime state, built by the lifespan and kept on app.state.runtime
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import dspy
+
+
+@dataclass(slots=True)
+class AppState:
+    """The LM plus each endpoint's DSPy module; None until configured"""
+    lm: Optional["dspy.LM"] = None
+    question_module: Optional["dspy.Module"] = None
+    reasoning_module: Optional["dspy.Module"] = None
+    agent_module: Optional["dspy.Module"] = None
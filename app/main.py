@@ -1,36 +1,22 @@
 """
 DSPyBridge - Main FastAPI application
 """
-import dspy
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.core import config, setup_logging
+from app.core import AppState, clock, config, setup_logging
+from app.services import configure_dspy, close_dspy, warm_up
 from app.api import (
     health_router, qa_router, info_router, 
     agent_router, upload_router, finetuning_router
     ,retrieval_router
 )
+from app.api import agent, finetuning, qa, retrieval
 
-import os
 # Setup logging
 logger = setup_logging()
-lm = dspy.LM(
-    api_key=config.GROQ_API_KEY,
-    model=config.DEFAULT_MODEL,
-    temperature=config.DEFAULT_TEMPERATURE,
-    max_tokens=config.DEFAULT_MAX_TOKENS
-)
-# configure dspy with azure openai deployment
-# openailm = dspy.LM(
-#     model=config.AZURE_OPENAI_DEPLOYMENT,
-#     azure_openai_api_key=config.AZURE_OPENAI_API_KEY,
-#     azure_openai_base_url=config.AZURE_OPENAI_BASE_URL,
-#     azure_openai_version=config.AZURE_OPENAI_VERSION
-# )
-
-dspy.configure(lm=lm)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -40,48 +26,87 @@ async def lifespan(app: FastAPI):
     logger.info(f"DSPy configured: {config.is_configured}")
     logger.info(f"Running on {config.HOST}:{config.PORT}")
     
+    clock.start()
+    
+    # Each worker builds its LM client here, after fork and off the import path
+    state = app.state.runtime = AppState(lm=configure_dspy())
+    
+    # Build DSPy modules before the first request instead of on it
+    qa.configure_modules(state)
+    agent.configure_modules(state)
+    finetuning.load_optimized_model()
+    
+    if config.WARMUP_ENABLED and config.is_configured:
+        await warm_up(state.lm, (
+            qa.QuestionSignature, qa.ReasoningSignature, retrieval.ImprovedRAGSignature
+        ))
+    
     yield
     
     # Shutdown
+    await close_dspy()
+    await clock.stop()
     logger.info(f"Shutting down {config.APP_NAME}")
 
 
-# Create FastAPI app with lifespan
-app = FastAPI(
-    title=config.APP_NAME,
-    description="A FastAPI server that uses DSPy with Groq, ReAct agents, and tool integration",
-    version=config.VERSION,
-    docs_url="/docs",
-    redoc_url="/redoc",
-    lifespan=lifespan
+# (router, prefix, tags) for every API the server exposes
+ROUTERS = (
+    (health_router, "", ["Health"]),
+    (qa_router, "", ["Q&A"]),
+    (retrieval_router, "", ["RAG"]),
+    (info_router, "", ["Info"]),
+    (agent_router, "", ["Agent"]),
+    (upload_router, "", ["Upload"]),
+    (finetuning_router, "/api", ["Fine-tuning"]),
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=config.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Include routers
-app.include_router(health_router, tags=["Health"])
-app.include_router(qa_router, tags=["Q&A"])
-app.include_router(retrieval_router, tags=["RAG"])
-app.include_router(info_router, tags=["Info"])
-app.include_router(agent_router, tags=["Agent"])
-app.include_router(upload_router, tags=["Upload"])
-app.include_router(finetuning_router, prefix="/api", tags=["Fine-tuning"])
+def create_app(routers=ROUTERS) -> FastAPI:
+    """Build the FastAPI app: lifespan, CORS and the given routers"""
+    app = FastAPI(
+        title=config.APP_NAME,
+        description="A FastAPI server that uses DSPy with Groq, ReAct agents, and tool integration",
+        version=config.VERSION,
+        docs_url="/docs",
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+    
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=config.ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # Include routers
+    for router, prefix, tags in routers:
+        app.include_router(router, prefix=prefix, tags=tags)
+    
+    return app
+
+
+app = create_app()
 
 
 def run():
     """Start server (production-ish)."""
     import uvicorn
+    # Workers import the app themselves, so modules and caches are built post-fork
     uvicorn.run(
-        app,
+        "app.main:app",
         host=config.HOST,
         port=config.PORT,
+        workers=config.WORKERS,
+        loop=config.UVICORN_LOOP,
+        http=config.UVICORN_HTTP,
+        backlog=config.BACKLOG,
+        limit_concurrency=config.LIMIT_CONCURRENCY,
+        log_level=config.LOG_LEVEL,
+        access_log=config.ACCESS_LOG,
         reload=False,
     )
 
@@ -89,8 +114,9 @@ def run():
 def run_dev():
     """Start server in dev with reload and debug logs."""
     import uvicorn
+    # Reload needs an import string; an app object is silently served without it
     uvicorn.run(
-        app,
+        "app.main:app",
         host=config.HOST,
         port=config.PORT,
         reload=True,
@@ -99,10 +125,5 @@ def run_dev():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host=config.HOST,
-        port=config.PORT,
-        reload=config.DEBUG
-    )
+    # Same multi-worker setup as `poetry run start`; DEBUG=true gives the reloading dev server
+    run_dev() if config.DEBUG else run()
@@ -12,6 +12,8 @@ class TrainingResponse(BaseModel):
     examples_count: int
     status: str
     timestamp: datetime
+    job_id: Optional[str] = Field(default=None, description="Id to poll /train/status/{job_id} with")
+    error: Optional[str] = None
 
 
 class PredictionRequest(BaseModel):
@@ -0,0 +1,22 @@
+"""
+Shared services used by the API endpoints
+"""
+from .adapters import MemoizedChatAdapter
+from .bootstrap import ParallelBootstrapFewShot
+from .dspy_service import configure_dspy, close_dspy, install_lm_clients, warm_up
+from .executor import run_module
+from .keyword_index import KeywordIndex
+from .response_cache import ResponseCache, response_cache, response_key
+from .semantic_cache import SemanticCache
+from .streaming import stream_events, final_event, ndjson, sse
+
+__all__ = [
+    "MemoizedChatAdapter",
+    "ParallelBootstrapFewShot",
+    "configure_dspy", "close_dspy", "install_lm_clients", "warm_up",
+    "run_module",
+    "KeywordIndex",
+    "ResponseCache", "response_cache", "response_key",
+    "SemanticCache",
+    "stream_events", "final_event", "ndjson", "sse",
+]
@@ -0,0 +1,42 @@
+"""
+DSPy adapters with memoized prompt rendering
+"""
+import weakref
+from typing import Callable, Dict, Type
+
+from dspy import Signature
+from dspy.adapters import ChatAdapter
+
+
+class MemoizedChatAdapter(ChatAdapter):
+    """
+    ChatAdapter that renders each signature's system prompt parts once.
+
+    The field descriptions, field structure and task description depend only
+    on the signature, so they are memoized per signature instead of being
+    rebuilt on every call. The messages are the same as ChatAdapter's.
+    """
+
+    def __init__(self, callbacks=None):
+        super().__init__(callbacks)
+        self._rendered: Dict[str, "weakref.WeakKeyDictionary[Type[Signature], str]"] = {
+            "description": weakref.WeakKeyDictionary(),
+            "structure": weakref.WeakKeyDictionary(),
+            "task": weakref.WeakKeyDictionary(),
+        }
+
+    def _memoized(self, part: str, signature: Type[Signature], render: Callable[[Type[Signature]], str]) -> str:
+        cache = self._rendered[part]
+        text = cache.get(signature)
+        if text is None:
+            text = cache[signature] = render(signature)
+        return text
+
+    def format_field_description(self, signature: Type[Signature]) -> str:
+        return self._memoized("description", signature, super().format_field_description)
+
+    def format_field_structure(self, signature: Type[Signature]) -> str:
+        return self._memoized("structure", signature, super().format_field_structure)
+
+    def format_task_description(self, signature: Type[Signature]) -> str:
+        return self._memoized("task", signature, super().format_task_description)
@@ -0,0 +1,70 @@
+"""
+Few-shot bootstrapping with concurrent teacher calls
+"""
+import random
+
+import dspy
+from dspy.utils.parallelizer import ParallelExecutor
+
+
+class ParallelBootstrapFewShot(dspy.BootstrapFewShot):
+    """
+    BootstrapFewShot that traces training examples concurrently.
+
+    BootstrapFewShot traces one example at a time until max_bootstrapped_demos
+    succeed, so a compile waits on every teacher LM call in turn. Here each
+    wave traces as many examples as demos are still missing, num_threads at a
+    time, and keeps the successes in trainset order, so the demos match a
+    sequential compile. Each example is traced on its own copy of the
+    teacher, because tracing an example hides it from the teacher's demos.
+    Only one round is run; max_rounds is ignored.
+    """
+
+    def __init__(self, num_threads: int = 8, **kwargs):
+        super().__init__(**kwargs)
+        self.num_threads = num_threads
+
+    def _bootstrap(self, *, max_bootstraps=None):
+        max_bootstraps = max_bootstraps or self.max_bootstrapped_demos
+        self.name2traces = {name: [] for name in self.name2predictor}
+        bootstrapped = set()
+        executor = ParallelExecutor(num_threads=self.num_threads, max_errors=self.max_errors, disable_progress_bar=True)
+
+        start = 0
+        while len(bootstrapped) < max_bootstraps and start < len(self.trainset):
+            wave = range(start, min(start + max_bootstraps - len(bootstrapped), len(self.trainset)))
+            start = wave.stop
+            results = executor.execute(self._trace_example, [self.trainset[idx] for idx in wave])
+            for idx, demos in zip(wave, results):
+                # None means the call failed or the metric rejected the trace
+                if demos is not None:
+                    bootstrapped.add(idx)
+                    for name, demo in demos:
+                        self.name2traces[name].append(demo)
+
+        self.validation = [example for idx, example in enumerate(self.trainset) if idx not in bootstrapped]
+        random.Random(0).shuffle(self.validation)
+
+    def _trace_example(self, example):
+        """Run a teacher copy on one example; its (predictor name, demo) pairs, or None if the metric rejects it"""
+        teacher = self.teacher.deepcopy()
+        names = {}
+        for name, predictor in teacher.named_predictors():
+            names[id(predictor)] = name
+            predictor.demos = [demo for demo in predictor.demos if demo != example]
+
+        with dspy.context(trace=[], **self.teacher_settings):
+            prediction = teacher(**example.inputs())
+            trace = dspy.settings.trace
+
+        if self.metric:
+            score = self.metric(example, prediction, trace)
+            if not (score >= self.metric_threshold if self.metric_threshold else score):
+                return None
+
+        # One demo per predictor per example; a predictor called twice keeps its last call
+        demos = {}
+        for predictor, inputs, outputs in trace:
+            if id(predictor) in names:
+                demos[names[id(predictor)]] = dspy.Example(augmented=True, **inputs, **outputs)
+        return list(demos.items())
@@ -0,0 +1,94 @@
+"""
+Shared DSPy language model and HTTP connection pool
+"""
+import asyncio
+from typing import Iterable, Type
+
+import dspy
+import httpx
+import litellm
+
+from app.core import config, setup_logging
+from .adapters import MemoizedChatAdapter
+
+logger = setup_logging()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.LM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.LM_MAX_KEEPALIVE_CONNECTIONS,
+    )
+
+
+def install_lm_clients():
+    """
+    Install pooled httpx sessions as LiteLLM's sync and async clients.
+
+    LiteLLM's OpenAI-SDK based providers, such as the Azure deployment option,
+    pick up these sessions, so their pool size is set by config rather than
+    httpx's default. Groq does not: LiteLLM sends it through its own cached
+    HTTP handler, which already reuses connections across calls and ignores
+    these sessions. close_dspy closes them.
+    """
+    timeout = httpx.Timeout(config.LM_TIMEOUT)
+    litellm.client_session = httpx.Client(limits=_limits(), timeout=timeout)
+    litellm.aclient_session = httpx.AsyncClient(limits=_limits(), timeout=timeout)
+
+
+def configure_dspy() -> dspy.LM:
+    """Build the one LM every module shares, on the pooled clients, and install it in DSPy"""
+    install_lm_clients()
+
+    lm = dspy.LM(
+        api_key=config.GROQ_API_KEY,
+        model=config.DEFAULT_MODEL,
+        temperature=config.DEFAULT_TEMPERATURE,
+        max_tokens=config.DEFAULT_MAX_TOKENS,
+    )
+    # configure dspy with azure openai deployment
+    # lm = dspy.LM(
+    #     model=config.AZURE_OPENAI_DEPLOYMENT,
+    #     azure_openai_api_key=config.AZURE_OPENAI_API_KEY,
+    #     azure_openai_base_url=config.AZURE_OPENAI_BASE_URL,
+    #     azure_openai_version=config.AZURE_OPENAI_VERSION
+    # )
+
+    # One shared adapter, so each signature's system prompt is rendered once per worker
+    dspy.configure(lm=lm, adapter=MemoizedChatAdapter())
+    return lm
+
+
+async def warm_up(lm: dspy.LM, signatures: Iterable[Type[dspy.Signature]] = ()):
+    """
+    Pay one-off costs at startup instead of on the first request.
+
+    Renders each signature's system prompt through the configured adapter
+    (MemoizedChatAdapter memoizes it) and sends one uncached one-token LM call
+    from a worker thread, as requests do, so the sync HTTP client they share
+    already holds a live connection. Failures only log, since a slow or
+    unreachable provider must not stop the worker from booting.
+    """
+    adapter = dspy.settings.adapter
+    if adapter is not None:
+        for signature in signatures:
+            adapter.format(signature, demos=[], inputs={name: "" for name in signature.input_fields})
+
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(lm, messages=[{"role": "user", "content": "ping"}], max_tokens=1, cache=False),
+            timeout=config.WARMUP_TIMEOUT,
+        )
+        logger.info("LM warm-up call completed")
+    except Exception as e:
+        logger.warning(f"LM warm-up call failed: {e}")
+
+
+async def close_dspy():
+    """Close the pooled HTTP sessions installed by configure_dspy"""
+    if litellm.client_session is not None:
+        litellm.client_session.close()
+        litellm.client_session = None
+    if litellm.aclient_session is not None:
+        await litellm.aclient_session.aclose()
+        litellm.aclient_session = None
@@ -0,0 +1,215 @@
+"""
+Shared sentence-transformer embeddings
+"""
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+import dspy
+import numpy as np
+
+from app.core import config
+
+_model = None
+_model_lock = threading.Lock()
+
+# Written by export_dynamic_quantized_onnx_model for the "avx512_vnni" config
+_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+def default_device() -> str:
+    """Fastest torch device available: cuda, then Apple mps, then cpu"""
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def load_sentence_transformer(model_name: str, device: Optional[str] = None, backend: Optional[str] = None):
+    """
+    SentenceTransformer on the requested backend (config.EMBEDDING_BACKEND by default).
+
+    "onnx-int8" exports the model to ONNX once, dynamically quantizes the
+    weights to int8 (VNNI GEMMs on modern x86) and keeps the result under
+    EMBEDDING_CACHE_DIR; it always runs on the CPU. Pooling and normalization
+    stay with sentence-transformers, so encode() behaves the same on every backend.
+    """
+    from sentence_transformers import SentenceTransformer
+    backend = backend or config.EMBEDDING_BACKEND
+    if backend != "onnx-int8":
+        return SentenceTransformer(model_name, device=device or config.EMBEDDING_DEVICE or default_device(), backend=backend)
+
+    local = Path(config.EMBEDDING_CACHE_DIR) / "onnx-int8" / model_name.replace("/", "__")
+    if not (local / _INT8_FILE).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        def export(tmp: str):
+            exported = SentenceTransformer(model_name, device="cpu", backend="onnx")
+            exported.save(tmp)
+            export_dynamic_quantized_onnx_model(exported, "avx512_vnni", tmp)
+
+        _build_dir_atomic(local, export)
+    return SentenceTransformer(str(local), device="cpu", backend="onnx", model_kwargs={"file_name": _INT8_FILE})
+
+
+def get_embedder():
+    """Load the sentence-transformer once per process and share it"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import torch
+                # Every worker has its own model; unpinned, each would start a thread per core
+                torch.set_num_threads(config.TORCH_THREADS)
+                _model = load_sentence_transformer(config.EMBEDDING_MODEL)
+    return _model
+
+
+def encode(texts: Union[str, List[str]]) -> np.ndarray:
+    """Encode texts into L2-normalized embedding rows"""
+    if isinstance(texts, str):
+        texts = [texts]
+    return get_embedder().encode(
+        texts,
+        batch_size=config.EMBEDDING_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+
+
+def embed(texts: Union[str, List[str]]) -> List[List[float]]:
+    """Embedding function in the list-of-lists form dspy retrievers expect"""
+    return encode(texts).tolist()
+
+
+def _cache_path(corpus: List[str], model_name: str, suffix: str) -> Path:
+    """Cache file for one (model, backend, corpus) triple; int8 rows differ slightly from fp32 ones"""
+    digest = hashlib.sha1("\x00".join([model_name, config.EMBEDDING_BACKEND, *corpus]).encode()).hexdigest()
+    return Path(config.EMBEDDING_CACHE_DIR) / f"{digest}{suffix}"
+
+
+def _write_atomic(path: Path, write: Callable[[str], None]):
+    """Write to a temp name then rename, so a worker starting alongside never loads a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(str(tmp))
+    os.replace(tmp, path)
+
+
+def _build_dir_atomic(path: Path, build: Callable[[str], None]):
+    """Build a directory under a temp name then rename it into place; if another worker got there first, keep theirs"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    build(str(tmp))
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Renaming onto a non-empty directory fails, so a finished export is never overwritten
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_corpus_embeddings(
+    corpus: List[str],
+    encode_fn: Optional[Callable] = None,
+    model_name: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Corpus embedding matrix, cached on disk under a hash of the model name and corpus text.
+
+    The DOCX corpus rarely changes, so warm starts load the matrix instead of
+    re-running the encoder over every chunk. model_name must identify encode_fn.
+    """
+    encode_fn = encode_fn or encode
+    path = _cache_path(corpus, model_name or config.EMBEDDING_MODEL, ".npy")
+    if path.exists():
+        return np.load(path)
+
+    embeddings = np.asarray(encode_fn(corpus), dtype=np.float32)
+
+    def write(tmp: str):
+        with open(tmp, "wb") as f:
+            np.save(f, embeddings)
+
+    _write_atomic(path, write)
+    return embeddings
+
+
+class CachedEmbeddings(dspy.retrievers.Embeddings):
+    """
+    dspy Embeddings retriever whose corpus matrix comes from load_corpus_embeddings.
+
+    Corpora of at least brute_force_threshold chunks get a FAISS HNSW graph
+    (inner product over normalized rows, i.e. cosine) that preselects
+    candidates for the base class's exact rerank. The graph is persisted next
+    to the matrix. Without faiss installed, search stays brute force.
+    """
+
+    def __init__(
+        self,
+        corpus: List[str],
+        embedder: Callable,
+        k: int = 5,
+        model_name: Optional[str] = None,
+        brute_force_threshold: Optional[int] = None,
+        **kwargs,
+    ):
+        model_name = model_name or config.EMBEDDING_MODEL
+        self._index_path = _cache_path(corpus, model_name, ".hnsw")
+        matrix = load_corpus_embeddings(corpus, embedder, model_name)
+        if brute_force_threshold is None:
+            brute_force_threshold = config.EMBEDDING_ANN_THRESHOLD
+        # The base class embeds the corpus in __init__; hand it the cached matrix instead
+        super().__init__(
+            corpus=corpus,
+            embedder=lambda _: matrix,
+            k=k,
+            brute_force_threshold=brute_force_threshold,
+            **kwargs,
+        )
+        self.embedder = embedder
+
+    def _build_faiss(self):
+        try:
+            import faiss
+        except ImportError:
+            return None
+
+        if self._index_path.exists():
+            index = faiss.read_index(str(self._index_path))
+        else:
+            vectors = np.ascontiguousarray(self.corpus_embeddings, dtype=np.float32)
+            index = faiss.IndexHNSWFlat(vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            index.add(vectors)
+            _write_atomic(self._index_path, lambda tmp: faiss.write_index(index, tmp))
+        index.hnsw.efSearch = max(64, self.k * 10)
+        return index
+
+    def _faiss_search(self, query_embeddings: np.ndarray, num_candidates: int):
+        num_candidates = min(num_candidates, len(self.corpus))
+        _, ids = self.index.search(np.ascontiguousarray(query_embeddings, dtype=np.float32), num_candidates)
+        return ids
+
+    def _rerank_and_predict(self, q_embeds: np.ndarray, candidate_indices: np.ndarray):
+        # HNSW pads a row with -1 when it finds fewer neighbours; those slots score -inf and are dropped
+        valid = candidate_indices >= 0
+        candidate_embeddings = self.corpus_embeddings[np.where(valid, candidate_indices, 0)]
+        scores = np.einsum("qd,qkd->qk", q_embeds, candidate_embeddings)
+        scores[~valid] = -np.inf
+
+        order = np.argsort(-scores, axis=1)[:, : self.k]
+        top_indices = np.take_along_axis(candidate_indices, order, axis=1)
+        top_valid = np.take_along_axis(valid, order, axis=1)
+
+        results = []
+        for indices, keep in zip(top_indices, top_valid):
+            indices = indices[keep]
+            results.append(([self.corpus[idx] for idx in indices], list(indices)))
+        return results
@@ -0,0 +1,28 @@
+"""
+Worker threads for DSPy module calls
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+import dspy
+
+from app.core import config
+
+
+# Long-lived pool for module calls, at most one thread per LM connection
+_executor = ThreadPoolExecutor(max_workers=config.LM_MAX_CONNECTIONS, thread_name_prefix="dspy-module")
+
+
+async def run_module(module: dspy.Module, **kwargs: Any) -> Any:
+    """
+    Run one DSPy module call on the shared executor and await its prediction.
+
+    Each call gets its own thread because dspy.settings overrides are
+    thread-local: a module awaited on the shared event loop would see other
+    requests' overrides. Groq has no batch endpoint, so requests are not
+    grouped; concurrent calls simply run side by side.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(module, **kwargs))
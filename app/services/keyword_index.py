@@ -0,0 +1,83 @@
+"""
+Inverted keyword index for lexical retrieval over a fixed corpus
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Word characters only, so trailing punctuation doesn't split the vocabulary
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; shared by every lexical scorer so they agree"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first, without a full sort.
+
+    Ties keep position order, as a stable descending sort would, so callers
+    ranking pre-ordered candidates don't reshuffle equal scores.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    positions = np.arange(scores.size)
+    if scores.size > k:
+        kth = np.partition(scores, -k)[-k]
+        above = positions[scores > kth]
+        tied = positions[scores == kth][:k - above.size]
+        positions = np.concatenate((above, tied))
+    return positions[np.lexsort((positions, -scores[positions]))]
+
+
+class KeywordIndex:
+    """
+    Okapi BM25 index built once per corpus.
+
+    Each token's postings are stored as numpy arrays of doc ids and BM25 term
+    weights, computed here rather than per query, so scoring a query is one
+    vectorized scatter-add per query token. Every keyword retriever uses this
+    one scorer, so they rank the same corpus the same way.
+    """
+
+    def __init__(self, corpus: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.corpus = list(corpus)
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        doc_lens = np.zeros(len(self.corpus), dtype=np.float64)
+        for doc_id, doc in enumerate(self.corpus):
+            tokens = tokenize(doc)
+            doc_lens[doc_id] = len(tokens)
+            for token, count in Counter(tokens).items():
+                doc_ids, counts = postings[token]
+                doc_ids.append(doc_id)
+                counts.append(count)
+        
+        n_docs = len(self.corpus)
+        # Length normalization per document, shared by every term
+        norm = k1 * (1 - b + b * doc_lens / max(doc_lens.mean(), 1.0)) if n_docs else doc_lens
+        self._postings = {}
+        for token, (doc_ids, counts) in postings.items():
+            doc_ids = np.array(doc_ids, dtype=np.intp)
+            tf = np.array(counts, dtype=np.float64)
+            idf = math.log(1 + (n_docs - doc_ids.size + 0.5) / (doc_ids.size + 0.5))
+            self._postings[token] = (doc_ids, idf * tf * (k1 + 1) / (tf + norm[doc_ids]))
+
+    def search(self, query: str, top_k: int = 2) -> List[str]:
+        """Documents with the highest summed weight of the query tokens"""
+        scores = np.zeros(len(self.corpus), dtype=np.float64)
+        for token in tokenize(query):
+            posting = self._postings.get(token)
+            if posting is not None:
+                # Doc ids are unique within a posting, so fancy-index add is safe
+                doc_ids, weights = posting
+                scores[doc_ids] += weights
+        
+        hits = np.flatnonzero(scores)
+        # Ties keep corpus order
+        hits = hits[top_k_indices(scores[hits], top_k)]
+        return [self.corpus[doc_id] for doc_id in hits]
@@ -0,0 +1,79 @@
+"""
+Exact-match response cache on disk
+"""
+import hashlib
+import os
+from functools import lru_cache
+from typing import Any, Optional, Type
+
+import diskcache
+import dspy
+import orjson
+
+from app.core import config
+
+
+# LM settings that never change what the model answers
+_UNKEYED_LM_KWARGS = frozenset({"api_key"})
+
+
+@lru_cache(maxsize=256)
+def _signature_fingerprint(signature: Type[dspy.Signature]) -> tuple:
+    """What a signature renders into the prompt: instructions, then each field's name, role, prefix, desc and type"""
+    return signature.instructions, [
+        (name, field.json_schema_extra, str(field.annotation)) for name, field in signature.fields.items()
+    ]
+
+
+def response_key(endpoint: str, program: Optional[dspy.Module], lm: Optional[dspy.LM], /, **inputs: Any) -> str:
+    """
+    Content-addressed key for one endpoint's inputs.
+
+    The key also covers the signature of every predictor in program and the
+    LM's model and call settings, so changing instructions, field order,
+    DEFAULT_MODEL, temperature or max_tokens never serves answers produced
+    under the old ones.
+    """
+    if lm is None:
+        model, lm_kwargs = config.DEFAULT_MODEL, {}
+    else:
+        model = lm.model
+        lm_kwargs = {name: value for name, value in lm.kwargs.items() if name not in _UNKEYED_LM_KWARGS}
+    signatures = [] if program is None else [
+        _signature_fingerprint(predictor.signature) for _, predictor in program.named_predictors()
+    ]
+    payload = orjson.dumps(
+        [endpoint, model, lm_kwargs, signatures, inputs], option=orjson.OPT_SORT_KEYS, default=str
+    )
+    return hashlib.blake2b(payload).hexdigest()
+
+
+class ResponseCache:
+    """
+    Answers to byte-identical requests, shared by every worker through one directory.
+
+    Entries are tagged with their endpoint, so one endpoint's answers can be
+    dropped (e.g. after retraining) without touching the others.
+    """
+
+    def __init__(self, directory: str, size_limit: int, ttl: Optional[float] = None):
+        self._cache = diskcache.FanoutCache(directory, shards=8, size_limit=size_limit, tag_index=True)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Any:
+        """Cached answer, or None on a miss"""
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, tag: str):
+        self._cache.set(key, value, expire=self.ttl, tag=tag)
+
+    def evict(self, tag: str):
+        """Drop every entry stored under tag"""
+        self._cache.evict(tag)
+
+
+response_cache = ResponseCache(
+    os.path.join(config.QA_CACHE_DIR, "responses"),
+    size_limit=config.QA_CACHE_SIZE_LIMIT,
+    ttl=config.RESPONSE_CACHE_TTL or None,
+)
@@ -0,0 +1,57 @@
+"""
+Embedding-similarity response cache
+"""
+import threading
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Cache that also answers paraphrases of previously seen queries.
+
+    Entries are kept as normalized embedding rows, so a lookup is one
+    matrix-vector product. Once full, the oldest entry is overwritten.
+    """
+
+    def __init__(self, encode: Callable[[str], np.ndarray], threshold: float = 0.92, max_entries: int = 10000):
+        self._encode = encode
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embed a query; callers reuse the vector for both get and add"""
+        return np.asarray(self._encode(text), dtype=np.float32).reshape(-1)
+
+    def get(self, vector: np.ndarray) -> Optional[Any]:
+        """Return the value of the most similar entry above the threshold"""
+        with self._lock:
+            if not self._size:
+                return None
+            similarities = self._vectors[:self._size] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                return self._values[best]
+            return None
+
+    def add(self, vector: np.ndarray, value: Any):
+        """Store a value under the query's embedding"""
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            self._vectors[self._next] = vector
+            self._values[self._next] = value
+            self._next = (self._next + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self):
+        with self._lock:
+            self._values = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
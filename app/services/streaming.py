@@ -0,0 +1,93 @@
+"""
+Streaming helpers for DSPy modules
+"""
+from typing import Any, AsyncIterator, Dict, Iterable
+
+import anyio
+import dspy
+import orjson
+from dspy.streaming import StatusMessage, StreamListener
+from dspy.streaming.messages import StatusStreamingCallback
+from dspy.streaming.streaming_listener import find_predictor_for_stream_listeners
+from litellm import ModelResponseStream
+
+from app.core import config, setup_logging
+
+logger = setup_logging()
+
+# Streams draw on their own limiter: anyio's default 40 tokens are shared with
+# sync endpoints and background tasks such as /train
+_stream_limiter = anyio.CapacityLimiter(config.LM_MAX_CONNECTIONS)
+
+
+async def stream_events(
+    program: dspy.Module,
+    fields: Iterable[str],
+    **kwargs: Any,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a DSPy module and yield its output as events while it generates.
+
+    Token events carry the output field they belong to, status events
+    report tool calls, and the last event holds the full prediction.
+
+    This is dspy.streamify with one difference: streamify enters
+    dspy.context(send_stream=...) on the calling thread and holds it across
+    an await. dspy.settings overrides are thread-local, so on the shared event
+    loop every concurrent request would pick up this stream. Here the
+    overrides are set on the worker thread that runs the program, and the
+    event loop only relays chunks.
+    """
+    # Listeners keep per-stream state, so each call gets fresh ones
+    listeners = [StreamListener(signature_field_name=field) for field in fields]
+    listeners_by_predict = find_predictor_for_stream_listeners(program, listeners)
+    callbacks = [*dspy.settings.callbacks, StatusStreamingCallback()]
+    send_stream, receive_stream = anyio.create_memory_object_stream(16)
+
+    def run_program():
+        with dspy.context(send_stream=send_stream, stream_listeners=listeners, callbacks=callbacks):
+            return program(**kwargs)
+
+    async def produce():
+        # The LM streams through anyio.from_thread, which needs an anyio worker thread
+        try:
+            result = await anyio.to_thread.run_sync(run_program, limiter=_stream_limiter)
+        except Exception as e:
+            result = e
+        await send_stream.send(result)
+
+    async with anyio.create_task_group() as tg, send_stream, receive_stream:
+        tg.start_soon(produce)
+        async for value in receive_stream:
+            if isinstance(value, ModelResponseStream):
+                for listener in listeners_by_predict.get(value.predict_id, ()):
+                    chunk = listener.receive(value)
+                    if chunk:
+                        yield {"field": chunk.signature_field_name, "token": chunk.chunk}
+            elif isinstance(value, StatusMessage):
+                yield {"status": value.message}
+            elif isinstance(value, dspy.Prediction):
+                yield {"done": True, "prediction": dict(value.items())}
+                return
+            elif isinstance(value, Exception):
+                # Headers are already sent, so the failure is reported in-band
+                logger.error(f"Streaming error: {value}")
+                yield {"done": True, "error": str(value)}
+                return
+
+
+async def final_event(**prediction: Any) -> AsyncIterator[Dict[str, Any]]:
+    """Yield a lone final event, for responses that never reach the LM"""
+    yield {"done": True, "prediction": prediction}
+
+
+async def ndjson(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode events as newline-delimited JSON"""
+    async for event in events:
+        yield orjson.dumps(event) + b"\n"
+
+
+async def sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode events as server-sent events"""
+    async for event in events:
+        yield b"data: " + orjson.dumps(event) + b"\n\n"
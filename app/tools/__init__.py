@@ -1,23 +1,30 @@
 """
 Simple tools for DSPy agents
 """
-from .weather_tool import get_weather_tool
-from .joke_tool import get_joke_tool
+from .weather_tool import get_weather_tool, lookup_weather
+from .joke_tool import get_joke_tool, lookup_joke
 from .time_tool import get_current_time_tool, get_current_date_tool
+from .intent import is_joke_request, extract_weather_city
+
+_DEFAULT_TOOLS = (
+    get_weather_tool,
+    get_joke_tool,
+    get_current_time_tool,
+    get_current_date_tool
+)
 
 def get_default_tools():
     """Get the default set of tools (as callables)"""
-    return [
-        get_weather_tool,
-        get_joke_tool,
-        get_current_time_tool,
-        get_current_date_tool
-    ]
+    return list(_DEFAULT_TOOLS)
 
 __all__ = [
     "get_weather_tool",
     "get_joke_tool",
+    "lookup_weather",
+    "lookup_joke",
     "get_current_time_tool",
     "get_current_date_tool",
-    "get_default_tools"
+    "get_default_tools",
+    "is_joke_request",
+    "extract_weather_city"
 ]
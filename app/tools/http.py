@@ -0,0 +1,28 @@
+"""
+Pooled HTTP sessions for the tools
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Fail fast on unreachable hosts; only the read phase gets the longer budget
+CONNECT_TIMEOUT = 3.05
+
+
+def timeouts(read: float):
+    """(connect, read) timeout pair for requests"""
+    return (CONNECT_TIMEOUT, read)
+
+
+def make_session() -> requests.Session:
+    """Session that keeps connections alive and retries transient failures"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
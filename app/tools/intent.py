@@ -0,0 +1,36 @@
+"""
+Cheap intent checks that let the agent skip ReAct for single-tool requests
+"""
+import re
+from typing import Optional
+
+# One C-level scan per pattern instead of a Python loop over keywords
+_JOKE_RE = re.compile(r"\b(?:jokes?|make me laugh|something funny)\b", re.IGNORECASE)
+_OTHER_TOOL_RE = re.compile(r"\b(?:weather|time|date|today|forecast|temperature)\b", re.IGNORECASE)
+
+# Trailing words that qualify a weather request rather than name the city
+_PRESENT = r"today|now|right now|currently|at the moment"
+_FORECAST = r"tomorrow|tonight|later|this (?:morning|afternoon|evening|week|weekend)|next \w+|on \w+day"
+_UNITS = r"(?:in|with) (?:celsius|fahrenheit|kelvin|metric|imperial)(?: units)?"
+_WEATHER_CITY_RE = re.compile(
+    rf"\bweather\s+(?:like\s+)?(?:in|for|at)\s+([a-z][a-z .'-]*?)"
+    rf"((?:\s+(?:{_PRESENT}|{_FORECAST}|{_UNITS}))*)\s*[?.!]*$",
+    re.IGNORECASE,
+)
+# The weather tool only reports current conditions in Celsius
+_UNSUPPORTED_RE = re.compile(rf"\b(?:{_FORECAST}|fahrenheit|kelvin|imperial)\b", re.IGNORECASE)
+
+
+def is_joke_request(text: str) -> bool:
+    """True if the request only asks for a joke"""
+    return _JOKE_RE.search(text) is not None and _OTHER_TOOL_RE.search(text) is None
+
+
+def extract_weather_city(text: str) -> Optional[str]:
+    """The city of a plain "weather in <city>" request for current conditions, or None"""
+    if _JOKE_RE.search(text):
+        return None
+    match = _WEATHER_CITY_RE.search(text.strip())
+    if not match or " and " in match.group(1) or _UNSUPPORTED_RE.search(match.group(2)):
+        return None
+    return match.group(1).strip().title()
@@ -1,40 +1,40 @@
 """
 Simple joke tool for DSPy agents
 """
+from typing import Tuple
+
+import orjson
 import requests
 
+from .http import make_session, timeouts
 
-def get_joke_tool() -> str:
-    """
-    Get a random joke from JokeAPI.
-    
-    Returns:
-        str: A random joke or error message
-    """
+# Reused across calls so the TLS connection to the joke API stays open
+_SESSION = make_session()
+
+JOKE_URL = "https://v2.jokeapi.dev/joke/Any?safe-mode"
+_TIMEOUT = timeouts(10)
+
+
+def _format_joke(data) -> Tuple[str, bool]:
+    """Joke text, and whether the API actually returned a joke"""
+    if isinstance(data, dict):
+        if data.get("type") == "single" and data.get("joke"):
+            return data["joke"], True
+        elif data.get("type") == "twopart" and data.get("setup") and data.get("delivery"):
+            return f"{data['setup']} ... {data['delivery']}", True
+    return "Sorry, I couldn't fetch a joke.", False
+
+
+def lookup_joke() -> Tuple[str, bool]:
+    """A random joke or error message, and whether the fetch succeeded"""
     try:
-        url = "https://sv443.net/jokeapi/v2/joke/Any"
-        response = requests.get(url, timeout=15)
-        data = response.json()
-        
-        if data.get("error"):
-            return "Sorry, I couldn't fetch a joke right now."
-        
-        # Handle two-part jokes (setup + delivery)
-        if data.get("type") == "twopart":
-            setup = data.get("setup", "")
-            delivery = data.get("delivery", "")
-            if setup and delivery:
-                return f"{setup}\n{delivery}"
-        
-        # Handle single-line jokes
-        joke = data.get("joke")
-        if joke:
-            return joke
-        
-        return "Sorry, no joke available right now."
-        
-    except Exception:
-        return "Sorry, I couldn't fetch a joke right now."
+        response = _SESSION.get(JOKE_URL, timeout=_TIMEOUT)
+        data = orjson.loads(response.content)
+    except (requests.RequestException, ValueError):
+        data = None
+    return _format_joke(data)
+
+
 def get_joke_tool(params: dict = None) -> str:
     """
     Get a random joke from JokeAPI.
@@ -43,15 +43,4 @@ def get_joke_tool(params: dict = None) -> str:
     Returns:
         str: A random joke or error message
     """
-    import requests
-    try:
-        response = requests.get("https://v2.jokeapi.dev/joke/Any?safe-mode", timeout=10)
-        data = response.json()
-        if data.get("type") == "single":
-            return data.get("joke")
-        elif data.get("type") == "twopart":
-            return f"{data.get('setup')} ... {data.get('delivery')}"
-        else:
-            return "Sorry, I couldn't fetch a joke."
-    except Exception:
-        return "Sorry, I couldn't fetch a joke."
+    return lookup_joke()[0]
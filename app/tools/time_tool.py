@@ -2,13 +2,26 @@
 Time and date tools for DSPy agents
 """
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, Any
 
-try:
-    import pytz
-    PYTZ_AVAILABLE = True
-except ImportError:
-    PYTZ_AVAILABLE = False
+UTC = timezone.utc
+
+
+@lru_cache(maxsize=1)
+def _pytz():
+    """Import pytz on first use (it is slow to import); None if not installed"""
+    try:
+        import pytz
+        return pytz
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=128)
+def _tz(name: str):
+    """pytz.timezone parses zoneinfo data from disk; resolve each name once"""
+    return _pytz().timezone(name)
 
 
 def get_current_time_tool(params: Dict[str, Any] = None) -> str:
@@ -26,23 +39,27 @@ def get_current_time_tool(params: Dict[str, Any] = None) -> str:
     timezone_name = params.get("timezone_name", "UTC") if params else "UTC"
     try:
         if timezone_name.upper() == "UTC":
-            tz = timezone.utc
-            current_time = datetime.now(tz)
-        elif PYTZ_AVAILABLE:
-            tz = pytz.timezone(timezone_name)
-            current_time = datetime.now(tz)
+            current_time = datetime.now(UTC)
+        elif _pytz() is not None:
+            current_time = datetime.now(_tz(timezone_name))
         else:
             # Fallback to UTC if pytz not available
-            current_time = datetime.now(timezone.utc)
+            current_time = datetime.now(UTC)
             timezone_name = "UTC (pytz not available)"
         
-        formatted_time = current_time.strftime("%Y-%m-%d %H:%M:%S %Z")
+        if current_time.tzinfo is UTC:
+            # isoformat skips strftime's locale-aware pass; [:19] drops the "+00:00" offset
+            formatted_time = current_time.isoformat(" ", "seconds")[:19] + " UTC"
+        else:
+            formatted_time = current_time.strftime("%Y-%m-%d %H:%M:%S %Z")
         
         return f"Current time in {timezone_name}: {formatted_time}"
         
-    except Exception as e:
-        if PYTZ_AVAILABLE and "UnknownTimeZoneError" in str(type(e)):
-            return f"Unknown timezone: {timezone_name}. Try 'UTC', 'US/Eastern', 'Europe/London', etc."
+    except KeyError:
+        # pytz.UnknownTimeZoneError subclasses KeyError
+        return f"Unknown timezone: {timezone_name}. Try 'UTC', 'US/Eastern', 'Europe/London', etc."
+    except (AttributeError, TypeError, ValueError) as e:
+        # e.g. a non-string timezone_name from the LM
         return f"Error getting time: {str(e)}"
 
 
@@ -53,11 +70,5 @@ def get_current_date_tool() -> str:
     Returns:
         str: Current date in ISO format
     """
-    try:
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        day_name = datetime.now().strftime("%A")
-        
-        return f"Today is {day_name}, {current_date}"
-        
-    except Exception as e:
-        return f"Error getting date: {str(e)}"
+    now = datetime.now()
+    return f"Today is {now:%A}, {now:%Y-%m-%d}"
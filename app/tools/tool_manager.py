@@ -1,7 +1,7 @@
 """
 Tool management utilities for DSPy agents
 """
-from typing import List, Callable, Dict, Any
+from typing import List, Callable, Dict, Tuple
 from .weather_tool import get_weather_tool
 from .joke_tool import get_joke_tool
 from .time_tool import get_current_time_tool, get_current_date_tool
@@ -10,8 +10,11 @@ from .time_tool import get_current_time_tool, get_current_date_tool
 class ToolRegistry:
     """Registry for managing available tools"""
     
+    __slots__ = ("_tools", "_summaries")
+    
     def __init__(self):
         self._tools: Dict[str, Callable] = {}
+        self._summaries: Dict[str, str] = {}
         self._register_default_tools()
     
     def _register_default_tools(self):
@@ -24,6 +27,9 @@ class ToolRegistry:
     def register(self, name: str, tool_func: Callable):
         """Register a new tool"""
         self._tools[name] = tool_func
+        # Docstrings don't change after registration, so summarize once here
+        doc = tool_func.__doc__ or "No description available"
+        self._summaries[name] = doc.strip().split('\n', 1)[0]  # First line of docstring
     
     def get_tool(self, name: str) -> Callable:
         """Get a tool by name"""
@@ -35,7 +41,8 @@ class ToolRegistry:
     
     def get_tools_by_names(self, names: List[str]) -> List[Callable]:
         """Get specific tools by names"""
-        return [self._tools[name] for name in names if name in self._tools]
+        tools = self._tools
+        return [tools[name] for name in names if name in tools]
     
     def list_tool_names(self) -> List[str]:
         """List all available tool names"""
@@ -43,34 +50,36 @@ class ToolRegistry:
     
     def get_tool_info(self) -> Dict[str, str]:
         """Get information about all tools"""
-        info = {}
-        for name, tool in self._tools.items():
-            doc = tool.__doc__ or "No description available"
-            info[name] = doc.strip().split('\n')[0]  # First line of docstring
-        return info
+        return dict(self._summaries)
 
 
 # Global tool registry instance
 tool_registry = ToolRegistry()
 
 
+# Tool groupings are fixed, so build them once instead of on every call.
+# The getters hand out list copies, so callers can't mutate the shared sets.
+_DEFAULT_TOOLS: Tuple[Callable, ...] = (get_weather_tool, get_joke_tool)
+_EXTENDED_TOOLS: Tuple[Callable, ...] = (get_weather_tool, get_joke_tool, get_current_time_tool, get_current_date_tool)
+_CATEGORIES: Dict[str, Tuple[Callable, ...]] = {
+    "entertainment": (get_joke_tool,),
+    "weather": (get_weather_tool,),
+    "utility": (get_weather_tool, get_current_time_tool, get_current_date_tool),
+    "fun": (get_joke_tool,),
+    "time": (get_current_time_tool, get_current_date_tool)
+}
+
+
 def get_default_tools() -> List[Callable]:
     """Get the default set of tools for agents"""
-    return [get_weather_tool, get_joke_tool]
+    return list(_DEFAULT_TOOLS)
 
 
 def get_extended_tools() -> List[Callable]:
-    """Get an extended set of tools including dad jokes"""
-    return [get_weather_tool, get_joke_tool, get_dad_joke_tool]
+    """Get an extended set of tools including time and date"""
+    return list(_EXTENDED_TOOLS)
 
 
 def get_tools_by_category(category: str) -> List[Callable]:
     """Get tools by category"""
-    categories = {
-        "entertainment": [get_joke_tool],
-        "weather": [get_weather_tool],
-        "utility": [get_weather_tool, get_current_time_tool, get_current_date_tool],
-        "fun": [get_joke_tool],
-        "time": [get_current_time_tool, get_current_date_tool]
-    }
-    return categories.get(category, [])
+    return list(_CATEGORIES.get(category, ()))
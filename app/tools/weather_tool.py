@@ -1,39 +1,75 @@
 """
 Simple weather tool for DSPy agents
 """
+import threading
+from typing import Optional, Tuple
+
+import orjson
 import requests
-from dotenv import load_dotenv
-import os
+from cachetools import TTLCache
 
-load_dotenv(override=True)
+from app.core.config import config
+from .http import make_session, timeouts
 
-def get_weather_tool(city: str) -> str:
-    """
-    Get current weather for a city using OpenWeatherMap API.
-    
-    Args:
-        city (str): Name of the city to get weather for
-        
-    Returns:
-        str: Weather information or error message
-    """
-    api_key = os.getenv("WEATHER_API_KEY")
+# Reused across calls so the TLS connection to OpenWeatherMap stays open
+_SESSION = make_session()
+_TIMEOUT = timeouts(15)
+
+# Weather changes slowly; failures are cached briefly so an outage isn't hammered
+WEATHER_TTL = 300
+WEATHER_ERROR_TTL = 30
+_weather_cache = TTLCache(maxsize=256, ttl=WEATHER_TTL)
+_weather_errors = TTLCache(maxsize=256, ttl=WEATHER_ERROR_TTL)
+_weather_lock = threading.Lock()
+
+
+def _cached_weather(key: str) -> Optional[Tuple[str, bool]]:
+    """(sentence, is a real reading) from a recent lookup, or None"""
+    with _weather_lock:
+        result = _weather_cache.get(key)
+        if result is not None:
+            return result, True
+        result = _weather_errors.get(key)
+        return (result, False) if result is not None else None
+
+
+def _store_weather(key: str, result: str, ok: bool):
+    with _weather_lock:
+        (_weather_cache if ok else _weather_errors)[key] = result
+
+
+def _weather_url(city: str) -> str:
+    return f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={config.WEATHER_API_KEY}&units=metric"
+
+
+def _format_weather(city: str, data) -> Tuple[str, bool]:
+    """Weather sentence, and whether it is a real reading worth caching for the full TTL"""
     try:
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-
-        response = requests.get(url, timeout=15)
-        data = response.json()
-        
-        if data.get("cod") != 200:
-            return f"Sorry, I couldn't fetch the weather for {city}."
-        
-        temp = data["main"]["temp"]
-        description = data["weather"][0]["description"]
-        
-        return f"The weather in {city} is {temp}°C with {description}."
-        
-    except Exception:
-        return f"Sorry, I couldn't fetch the weather for {city}."
+        if data["cod"] == 200:
+            temp = data["main"]["temp"]
+            description = data["weather"][0]["description"]
+            return f"The weather in {city} is {temp}°C with {description}.", True
+    except (KeyError, IndexError, TypeError):
+        pass
+    return f"Sorry, I couldn't fetch the weather for {city}.", False
+
+
+def lookup_weather(city: str) -> Tuple[str, bool]:
+    """Weather sentence or error message for a city, and whether it is a real reading"""
+    key = city.strip().lower()
+    cached = _cached_weather(key)
+    if cached is not None:
+        return cached
+    try:
+        response = _SESSION.get(_weather_url(city), timeout=_TIMEOUT)
+        data = orjson.loads(response.content)
+    except (requests.RequestException, ValueError):
+        data = None
+    result, ok = _format_weather(city, data)
+    _store_weather(key, result, ok)
+    return result, ok
+
+
 def get_weather_tool(params: dict) -> str:
     """
     Get current weather for a city using OpenWeatherMap API.
@@ -45,15 +81,4 @@ def get_weather_tool(params: dict) -> str:
     city = params.get("city") if params else None
     if not city:
         return "Please provide a city name."
-    api_key = os.getenv("WEATHER_API_KEY")
-    try:
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-        response = requests.get(url, timeout=15)
-        data = response.json()
-        if data.get("cod") != 200:
-            return f"Sorry, I couldn't fetch the weather for {city}."
-        temp = data["main"]["temp"]
-        description = data["weather"][0]["description"]
-        return f"The weather in {city} is {temp}°C with {description}."
-    except Exception:
-        return f"Sorry, I couldn't fetch the weather for {city}."
+    return lookup_weather(city)[0]
@@ -1,7 +1,7 @@
 from docx import Document
 import dspy
 from app.core import config
-from sentence_transformers import SentenceTransformer
+from app.services.embeddings import CachedEmbeddings, load_sentence_transformer
 
 lm=dspy.LM(
     model = config.DEFAULT_MODEL,
@@ -19,18 +19,20 @@ def read_docx(filepath):
 docx_text = read_docx("docs\Roaming_SummerOffers.docx")
 corpus.append(docx_text) 
 
-hf_model = SentenceTransformer("all-MiniLM-L6-v2")  # fast & free
+hf_model = load_sentence_transformer("all-MiniLM-L6-v2")  # fast & free; EMBEDDING_BACKEND=onnx-int8 for quantized CPU encoding
 
 def hf_embed(texts):
     if isinstance(texts, str):
         texts = [texts]
-    return hf_model.encode(texts, convert_to_numpy=True).tolist()
+    return hf_model.encode(texts, batch_size=128, convert_to_numpy=True, show_progress_bar=False).tolist()
 
 
-retriever = dspy.retrievers.Embeddings(
+# Corpus embeddings are cached on disk, so reruns skip encoding the document
+retriever = CachedEmbeddings(
     embedder=hf_embed,
     corpus=corpus,
-    k=3  # number of docs to retrieve
+    k=3,  # number of docs to retrieve
+    model_name="all-MiniLM-L6-v2"
 )
 class RAG_Segnature(dspy.Signature):
     """RAG Signature"""
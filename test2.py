@@ -1,50 +1,56 @@
 from docx import Document
 import dspy
+import numpy as np
 from app.core import config
-from sentence_transformers import SentenceTransformer
+from app.services import KeywordIndex, MemoizedChatAdapter
+from app.services.keyword_index import tokenize, top_k_indices
+from app.services.embeddings import CachedEmbeddings, load_sentence_transformer
 import re
 from typing import List
 
-# Configure LM
+# Whitespace runs collapsed when formatting context; compiled once, not per doc per query
+_WS_RE = re.compile(r'\s+')
+
+# Groq calls go through LiteLLM's cached HTTP handler, which keeps its connections open across queries
 lm = dspy.LM(
     model=config.DEFAULT_MODEL,
     temperature=0.7,
     api_key=config.GROQ_API_KEY,
 )
-dspy.configure(lm=lm)
+# Same adapter as the app: each signature's system prompt is rendered once
+dspy.configure(lm=lm, adapter=MemoizedChatAdapter())
 
 # 1. IMPROVED DOCUMENT CHUNKING
 def read_docx_with_chunks(filepath, chunk_size=500, overlap=100):
-    """Read DOCX and split into overlapping chunks"""
+    """Read DOCX and yield overlapping chunks, without building the full text"""
+    # A window that does not advance would never drain the buffer
+    if not 0 <= overlap < chunk_size:
+        raise ValueError(f"overlap must be in [0, chunk_size), got overlap={overlap}, chunk_size={chunk_size}")
     doc = Document(filepath)
+    step = chunk_size - overlap
+    buf = []
     
-    # Extract all text including tables
-    all_text = []
-    
-    # Get paragraphs
-    for p in doc.paragraphs:
-        if p.text.strip():
-            all_text.append(p.text.strip())
-    
-    # Get tables
-    for table in doc.tables:
-        for row in table.rows:
-            row_text = " | ".join([cell.text.strip() for cell in row.cells if cell.text.strip()])
-            if row_text:
-                all_text.append(row_text)
-    
-    full_text = "\n".join(all_text)
-    
-    # Split into chunks with overlap
-    chunks = []
-    words = full_text.split()
-    
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        if chunk.strip():
-            chunks.append(chunk)
-    
-    return chunks
+    def texts():
+        # Get paragraphs
+        for p in doc.paragraphs:
+            yield p.text
+        
+        # Get tables
+        for table in doc.tables:
+            for row in table.rows:
+                yield " | ".join(text for text in (cell.text.strip() for cell in row.cells) if text)
+    
+    # Emit a window each time enough words are buffered, then slide by step
+    for text in texts():
+        buf.extend(text.split())
+        while len(buf) >= chunk_size:
+            yield " ".join(buf[:chunk_size])
+            del buf[:step]
+    
+    # Trailing (shorter) windows
+    while buf:
+        yield " ".join(buf)
+        del buf[:step]
 
 # 2. BETTER EMBEDDING MODEL (more specialized)
 def get_better_embedder():
@@ -52,10 +58,10 @@ def get_better_embedder():
     # Options (choose one):
     
     # Option A: Better general model
-    model = SentenceTransformer("all-mpnet-base-v2")  # Better than MiniLM
+    model = load_sentence_transformer("all-mpnet-base-v2")  # Better than MiniLM; honours EMBEDDING_BACKEND
     
     # Option B: For domain-specific (if available)
-    # model = SentenceTransformer("msmarco-distilbert-base-v4")  # Good for Q&A
+    # model = load_sentence_transformer("msmarco-distilbert-base-v4")  # Good for Q&A
     
     return model
 
@@ -96,19 +102,25 @@ def improved_embed(texts):
         texts = [texts]
     
     # Get embeddings
-    embeddings = hf_model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    # Large batches keep the GPU busy when the whole corpus is encoded at once
+    embeddings = hf_model.encode(
+        texts, batch_size=128, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+    )
     return embeddings.tolist()
 
 # 6. CUSTOM RETRIEVER WITH RERANKING
 class ImprovedRetriever:
     def __init__(self, embedder, corpus, k=5):
-        self.base_retriever = dspy.retrievers.Embeddings(
+        self.base_retriever = CachedEmbeddings(
             embedder=embedder,
             corpus=corpus,
-            k=k*2  # Get more candidates for reranking
+            k=k*2,  # Get more candidates for reranking
+            model_name="all-mpnet-base-v2"  # Cache key for the corpus embeddings
         )
         self.corpus = corpus
         self.k = k
+        # Tokenize the corpus once; only the query is tokenized per call
+        self.doc_tokens = [frozenset(tokenize(doc)) for doc in corpus]
     
     def __call__(self, query):
         # Enhance query
@@ -118,17 +130,16 @@ class ImprovedRetriever:
         initial_results = self.base_retriever(enhanced_query)
         
         # Simple reranking based on exact keyword matches
-        scored_results = []
-        query_words = set(query.lower().split())
+        query_words = frozenset(tokenize(query))
         
-        for doc in initial_results:
-            doc_words = set(doc.lower().split())
-            exact_matches = len(query_words.intersection(doc_words))
-            scored_results.append((exact_matches, doc))
+        # The retriever returns corpus indices alongside passages, so token sets are looked up, not rebuilt
+        indices = initial_results.indices
+        scores = np.fromiter(
+            (len(query_words & self.doc_tokens[idx]) for idx in indices), dtype=np.int64, count=len(indices)
+        )
         
-        # Sort by exact matches and return top k
-        scored_results.sort(key=lambda x: x[0], reverse=True)
-        return [doc for score, doc in scored_results[:self.k]]
+        # Top k by exact matches; ties keep the semantic order
+        return [self.corpus[indices[i]] for i in top_k_indices(scores, self.k)]
 
 # 7. IMPROVED RETRIEVER SETUP
 retriever = ImprovedRetriever(
@@ -140,8 +151,9 @@ retriever = ImprovedRetriever(
 # 8. BETTER RAG SIGNATURE WITH MORE SPECIFIC INSTRUCTIONS
 class ImprovedRAGSignature(dspy.Signature):
     """Answer questions about Vodafone telecommunication services using retrieved context."""
-    question = dspy.InputField(desc="User question about Vodafone services (roaming, plans, etc.)")
+    # Retrieved context leads, so queries hitting the same chunks share a prompt prefix
     context = dspy.InputField(desc="Relevant information from Vodafone documentation")
+    question = dspy.InputField(desc="User question about Vodafone services (roaming, plans, etc.)")
     answer = dspy.OutputField(desc="Helpful and accurate answer based on the context. If extending roaming, provide specific steps and requirements.")
 
 # 9. ENHANCED RAG MODULE WITH BETTER CONTEXT PROCESSING
@@ -159,7 +171,7 @@ class ImprovedRAG(dspy.Module):
         context_parts = []
         for i, doc in enumerate(docs, 1):
             # Clean up the text
-            clean_doc = re.sub(r'\s+', ' ', doc.strip())
+            clean_doc = _WS_RE.sub(' ', doc.strip())
             context_parts.append(f"[Context {i}]: {clean_doc}")
         
         context = "\n\n".join(context_parts)
@@ -176,20 +188,12 @@ class HybridRAG(dspy.Module):
         super().__init__()
         self.semantic_retrieve = retriever
         self.answer = dspy.Predict(ImprovedRAGSignature)
+        # Same BM25 index as the app, built once instead of scanning every doc per query
+        self.keyword_index = KeywordIndex(corpus)
     
     def keyword_search(self, question, top_k=2):
-        """Simple keyword-based fallback"""
-        question_words = question.lower().split()
-        scored_docs = []
-        
-        for doc in corpus:
-            doc_lower = doc.lower()
-            score = sum(doc_lower.count(word) for word in question_words)
-            if score > 0:
-                scored_docs.append((score, doc))
-        
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
-        return [doc for score, doc in scored_docs[:top_k]]
+        """BM25 keyword-based fallback"""
+        return self.keyword_index.search(question, top_k=top_k)
     
     def forward(self, question):
         # Get semantic results
@@ -198,13 +202,14 @@ class HybridRAG(dspy.Module):
         # Get keyword results as backup
         keyword_docs = self.keyword_search(question)
         
-        # Combine and deduplicate
-        all_docs = semantic_docs + [doc for doc in keyword_docs if doc not in semantic_docs]
+        # Combine and deduplicate; set lookups instead of scanning semantic_docs per keyword hit
+        seen = set(semantic_docs)
+        all_docs = semantic_docs + [doc for doc in keyword_docs if doc not in seen]
         
         # Format context
         context_parts = []
         for i, doc in enumerate(all_docs[:4], 1):  # Limit to top 4
-            clean_doc = re.sub(r'\s+', ' ', doc.strip())
+            clean_doc = _WS_RE.sub(' ', doc.strip())
             context_parts.append(f"[Source {i}]: {clean_doc}")
         
         context = "\n\n".join(context_parts)
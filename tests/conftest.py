@@ -0,0 +1,153 @@
+"""
+Shared test setup.
+
+app.core.config reads the environment at import, and the RAG router builds
+its corpus from ./docs at import, so both are arranged here before any test
+module imports the app: the session runs in a scratch directory holding one
+small DOCX. Nothing here reaches the network: the encoder is a hashed bag of
+words and LiteLLM is replaced per test by a scripted fake.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+import numpy as np
+import orjson
+import pytest
+
+from docx import Document
+
+_TMP = tempfile.mkdtemp(prefix="dspybridge-tests-")
+os.environ.update(
+    GROQ_API_KEY="test-key",
+    WARMUP_ENABLED="false",
+    SEMANTIC_CACHE_ENABLED="false",
+    DSPY_CACHEDIR=os.path.join(_TMP, ".dspy_cache"),
+    # LiteLLM otherwise fetches its model price list at import
+    LITELLM_LOCAL_MODEL_COST_MAP="True",
+)
+os.chdir(_TMP)
+os.mkdir("docs")
+_doc = Document()
+_doc.add_paragraph("Roaming offers let travellers use their plan abroad for a daily fee.")
+_doc.add_paragraph("To extend roaming, dial *100# before the current package expires.")
+_doc.save(os.path.join("docs", "offers.docx"))
+
+EMBEDDING_DIM = 64
+
+
+def fake_encode(texts):
+    """Bag-of-words vectors hashed into EMBEDDING_DIM buckets and L2-normalized"""
+    if isinstance(texts, str):
+        texts = [texts]
+    rows = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for token in text.lower().split():
+            rows[i, int(hashlib.md5(token.encode()).hexdigest(), 16) % EMBEDDING_DIM] += 1
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows / np.where(norms == 0, 1, norms)
+
+
+from app.services import embeddings  # noqa: E402
+
+embeddings.encode = fake_encode
+
+import litellm  # noqa: E402
+from litellm import ModelResponse, ModelResponseStream  # noqa: E402
+
+_QUESTION_RE = re.compile(r"\[\[ ## (?:question|user_request) ## \]\]\n(.*?)(?:\n\n|$)", re.S)
+
+
+class FakeLiteLLM:
+    """
+    Scripted stand-in for litellm.completion and litellm.acompletion.
+
+    Every prompt is answered with "answer to <question>", in ChatAdapter
+    format or as JSON when a response_format is sent, so a test can tell
+    which request a reply belongs to. Streams pause after their first chunk while `hold` is set, for at
+    most HOLD_TIMEOUT seconds, so a request stuck behind one fails instead of hanging.
+    """
+
+    HOLD_TIMEOUT = 5
+
+    def __init__(self):
+        self.sync_questions = []
+        self.sync_calls = []
+        self.stream_questions = []
+        self.stream_started = threading.Event()
+        self.hold = threading.Event()
+
+    @staticmethod
+    def question(kwargs) -> str:
+        prompt = kwargs["messages"][-1]["content"]
+        match = _QUESTION_RE.search(prompt)
+        return match.group(1).strip() if match else ""
+
+    @staticmethod
+    def reply(question: str, as_json: bool = False) -> str:
+        if as_json:
+            # One object for both ReAct steps: pick "finish", then give the final answer
+            return orjson.dumps({
+                "next_thought": f"thinking about {question}",
+                "next_tool_name": "finish",
+                "next_tool_args": {},
+                "reasoning": f"thinking about {question}",
+                "analysis_response": f"answer to {question}",
+            }).decode()
+        # ChatAdapter ignores sections outside the signature, so one reply fits QA and agent calls
+        return (
+            f"[[ ## reasoning ## ]]\nthinking about {question}\n\n"
+            f"[[ ## answer ## ]]\nanswer to {question}\n\n"
+            f"[[ ## analysis_response ## ]]\nanswer to {question}\n\n"
+            "[[ ## completed ## ]]"
+        )
+
+    def completion(self, **kwargs):
+        question = self.question(kwargs)
+        self.sync_questions.append(question)
+        self.sync_calls.append(kwargs)
+        content = self.reply(question, as_json="response_format" in kwargs)
+        return ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": content}}],
+            model=kwargs["model"],
+            usage={"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        )
+
+    async def acompletion(self, stream=False, **kwargs):
+        question = self.question(kwargs)
+        if not stream:
+            return self.completion(**kwargs)
+        self.stream_questions.append(question)
+        text = self.reply(question, as_json="response_format" in kwargs)
+
+        async def chunks():
+            for start in range(0, len(text), 5):
+                yield ModelResponseStream(choices=[{"delta": {"content": text[start:start + 5]}}])
+                self.stream_started.set()
+                deadline = time.monotonic() + self.HOLD_TIMEOUT
+                while self.hold.is_set() and time.monotonic() < deadline:
+                    await asyncio.sleep(0.01)
+
+        return chunks()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    fake = FakeLiteLLM()
+    monkeypatch.setattr(litellm, "completion", fake.completion)
+    monkeypatch.setattr(litellm, "acompletion", fake.acompletion)
+    return fake
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One app for the whole session: dspy.configure may only be called from one thread"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
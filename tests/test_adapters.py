@@ -0,0 +1,32 @@
+"""
+MemoizedChatAdapter: same messages as ChatAdapter, rendered once per signature
+"""
+from dspy.adapters import ChatAdapter
+
+from app.api.qa import ReasoningSignature
+from app.services import MemoizedChatAdapter
+
+INPUTS = {"question": "what is roaming", "context": "roaming offers"}
+
+
+def test_messages_match_chat_adapter():
+    memoized = MemoizedChatAdapter()
+
+    for _ in range(2):
+        assert memoized.format(ReasoningSignature, [], INPUTS) == ChatAdapter().format(ReasoningSignature, [], INPUTS)
+
+
+def test_system_prompt_parts_are_rendered_once(monkeypatch):
+    calls = []
+    render = ChatAdapter.format_field_description
+
+    def counting_render(self, signature):
+        calls.append(signature)
+        return render(self, signature)
+
+    monkeypatch.setattr(ChatAdapter, "format_field_description", counting_render)
+    adapter = MemoizedChatAdapter()
+    adapter.format(ReasoningSignature, [], INPUTS)
+    adapter.format(ReasoningSignature, [], {"question": "another question", "context": ""})
+
+    assert calls == [ReasoningSignature]
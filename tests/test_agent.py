@@ -0,0 +1,54 @@
+"""
+/agent: tool fast paths, JSON-mode tool selection and streaming
+"""
+import orjson
+
+from app.api import agent
+
+
+def test_joke_request_skips_the_lm(client, fake_llm, monkeypatch):
+    monkeypatch.setattr(agent, "lookup_joke", lambda: ("a joke", True))
+
+    response = client.post("/agent", json={"message": "tell me a joke"})
+
+    assert response.status_code == 200
+    assert response.json()["response"] == "a joke"
+    assert fake_llm.sync_calls == []
+
+
+def test_weather_request_calls_the_tool_with_the_city(client, fake_llm, monkeypatch):
+    cities = []
+    monkeypatch.setattr(agent, "lookup_weather", lambda city: (cities.append(city) or "sunny", True))
+
+    response = client.post("/agent", json={"message": "weather in paris"})
+
+    assert response.json()["response"] == "sunny"
+    assert cities == ["Paris"]
+    assert fake_llm.sync_calls == []
+
+
+def test_failed_fast_path_tool_falls_back_to_react(client, fake_llm, monkeypatch):
+    monkeypatch.setattr(agent, "lookup_weather", lambda city: ("Sorry, no weather.", False))
+
+    response = client.post("/agent", json={"message": "weather in atlantis"})
+
+    assert response.json()["response"] == "answer to weather in atlantis"
+    assert fake_llm.sync_calls
+
+
+def test_only_tool_selection_requests_a_response_format(client, fake_llm):
+    response = client.post("/agent", json={"message": "plan my roaming trip"})
+
+    assert response.status_code == 200
+    assert response.json()["response"] == "answer to plan my roaming trip"
+    # One tool-selection step picks "finish", then the extract step answers
+    assert ["response_format" in call for call in fake_llm.sync_calls] == [True, False]
+
+
+def test_agent_stream_emits_response_tokens(client, fake_llm):
+    response = client.post("/agent/stream", json={"message": "compare my roaming offers"})
+    events = [orjson.loads(line[len("data: "):]) for line in response.text.splitlines() if line]
+
+    tokens = "".join(event["token"] for event in events if event.get("field") == "analysis_response")
+    assert tokens.strip() == "answer to compare my roaming offers"
+    assert events[-1]["prediction"]["analysis_response"] == "answer to compare my roaming offers"
@@ -0,0 +1,83 @@
+"""
+Core helpers: clock, request guards and agent intent checks
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.guards import limit_text, require_text
+from app.core import clock, config
+from app.tools import extract_weather_city, is_joke_request
+
+
+@pytest.fixture
+def no_ticker(monkeypatch):
+    # The app's lifespan may already run a ticker on the TestClient's loop
+    monkeypatch.setattr(clock, "_ticker", None)
+
+
+def test_clock_without_ticker_reads_the_wall_clock(no_ticker):
+    before = datetime.now()
+
+    assert before <= clock.now() <= datetime.now()
+
+
+@pytest.mark.asyncio
+async def test_clock_ticker_serves_a_cached_time(no_ticker):
+    clock.start()
+    try:
+        first = clock.now()
+        assert clock.now() == first
+        await asyncio.sleep(clock.TICK_SECONDS * 3)
+        assert clock.now() > first
+    finally:
+        await clock.stop()
+    assert clock._ticker is None
+
+
+@pytest.mark.parametrize("value", [None, "", "   \n"])
+def test_require_text_rejects_empty_input(value):
+    with pytest.raises(HTTPException) as error:
+        require_text(value, "question")
+
+    assert error.value.status_code == 422
+
+
+def test_require_text_rejects_oversized_input():
+    with pytest.raises(HTTPException) as error:
+        require_text("x" * (config.MAX_INPUT_CHARS + 1), "question")
+
+    assert error.value.status_code == 413
+
+
+def test_text_at_the_limit_is_accepted():
+    require_text("x" * config.MAX_INPUT_CHARS, "question")
+    limit_text("x" * config.MAX_INPUT_CHARS, "context")
+    limit_text(None, "context")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Tell me a joke", True),
+    ("make me laugh please", True),
+    ("tell me a joke about the weather", False),
+    ("what's the date today", False),
+])
+def test_is_joke_request(text, expected):
+    assert is_joke_request(text) is expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("What's the weather in new york?", "New York"),
+    ("weather like in Paris today", "Paris"),
+    ("weather in paris in celsius", "Paris"),
+    ("weather in rome right now?", "Rome"),
+    ("weather in Paris tomorrow", None),
+    ("weather in boston in fahrenheit", None),
+    ("weather in paris and rome", None),
+    ("weather in paris, then tell me a joke", None),
+    ("is it raining", None),
+])
+def test_extract_weather_city(text, expected):
+    assert extract_weather_city(text) == expected
@@ -0,0 +1,47 @@
+"""
+Concurrent requests must not share DSPy settings overrides.
+
+dspy.settings.context is thread-local, so anything that holds an override
+on the event-loop thread leaks it into every request served meanwhile.
+"""
+import threading
+
+import orjson
+
+
+def test_reasoning_during_stream_does_not_join_the_stream(client, fake_llm):
+    fake_llm.hold.set()
+    lines = []
+
+    def stream():
+        response = client.post("/reasoning/stream", json={"question": "streamed question"})
+        lines.extend(orjson.loads(line) for line in response.text.splitlines())
+
+    streamer = threading.Thread(target=stream)
+    streamer.start()
+    try:
+        assert fake_llm.stream_started.wait(5)
+        plain = client.post("/reasoning", json={"question": "plain question"})
+    finally:
+        fake_llm.hold.clear()
+        streamer.join(10)
+
+    assert plain.status_code == 200
+    assert plain.json()["answer"] == "answer to plain question"
+    # The plain request made an ordinary call; only the streaming request streamed
+    assert fake_llm.sync_questions == ["plain question"]
+    assert fake_llm.stream_questions == ["streamed question"]
+
+    tokens = "".join(event["token"] for event in lines if event.get("field") == "answer")
+    assert tokens.strip() == "answer to streamed question"
+    assert lines[-1]["done"] is True
+    assert lines[-1]["prediction"]["answer"] == "answer to streamed question"
+
+
+def test_no_stream_state_survives_on_the_loop(client, fake_llm):
+    client.post("/reasoning/stream", json={"question": "first stream"})
+    response = client.post("/reasoning", json={"question": "after the stream"})
+
+    assert response.status_code == 200
+    assert response.json()["answer"] == "answer to after the stream"
+    assert fake_llm.stream_questions == ["first stream"]
@@ -0,0 +1,121 @@
+"""
+Corpus embedding cache: keys, atomic writes and reuse
+"""
+import dataclasses
+import os
+
+import numpy as np
+import pytest
+
+from app.core import config
+from app.services import embeddings
+from app.services.embeddings import (
+    CachedEmbeddings, _build_dir_atomic, _cache_path, _write_atomic, load_corpus_embeddings
+)
+from conftest import fake_encode
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "config", dataclasses.replace(config, EMBEDDING_CACHE_DIR=str(tmp_path)))
+    return tmp_path
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        return fake_encode(texts)
+
+
+def test_cache_path_depends_on_model_corpus_and_backend(cache_dir, monkeypatch):
+    path = _cache_path(["a", "b"], "model", ".npy")
+
+    assert path.parent == cache_dir
+    assert _cache_path(["a", "b"], "other-model", ".npy") != path
+    assert _cache_path(["a", "b", "c"], "model", ".npy") != path
+    # Chunk boundaries are part of the key
+    assert _cache_path(["ab"], "model", ".npy") != _cache_path(["a", "b"], "model", ".npy")
+    monkeypatch.setattr(embeddings, "config", dataclasses.replace(embeddings.config, EMBEDDING_BACKEND="onnx-int8"))
+    assert _cache_path(["a", "b"], "model", ".npy") != path
+
+
+def test_write_atomic_leaves_only_the_final_file(cache_dir):
+    target = cache_dir / "nested" / "matrix.bin"
+
+    _write_atomic(target, lambda tmp: open(tmp, "wb").write(b"payload"))
+
+    assert target.read_bytes() == b"payload"
+    assert [p.name for p in target.parent.iterdir()] == ["matrix.bin"]
+
+
+def export_to(label):
+    def build(tmp):
+        os.makedirs(tmp)
+        with open(os.path.join(tmp, "model.onnx"), "w") as f:
+            f.write(label)
+    return build
+
+
+def test_build_dir_atomic_leaves_only_the_final_directory(cache_dir):
+    target = cache_dir / "onnx-int8" / "model"
+
+    _build_dir_atomic(target, export_to("first"))
+
+    assert (target / "model.onnx").read_text() == "first"
+    assert [p.name for p in target.parent.iterdir()] == ["model"]
+
+
+def test_build_dir_atomic_keeps_an_export_already_in_place(cache_dir):
+    target = cache_dir / "onnx-int8" / "model"
+    _build_dir_atomic(target, export_to("first"))
+
+    _build_dir_atomic(target, export_to("second"))
+
+    assert (target / "model.onnx").read_text() == "first"
+    assert [p.name for p in target.parent.iterdir()] == ["model"]
+
+
+def test_corpus_is_encoded_once_then_loaded(cache_dir):
+    corpus = ["roaming abroad", "extend package"]
+    encoder = CountingEncoder()
+
+    first = load_corpus_embeddings(corpus, encoder, "model")
+    second = load_corpus_embeddings(corpus, encoder, "model")
+
+    assert encoder.calls == 1
+    np.testing.assert_array_equal(first, second)
+    assert second.dtype == np.float32
+
+
+def test_changed_corpus_is_re_encoded(cache_dir):
+    encoder = CountingEncoder()
+
+    load_corpus_embeddings(["roaming abroad"], encoder, "model")
+    load_corpus_embeddings(["roaming abroad", "new chunk"], encoder, "model")
+
+    assert encoder.calls == 2
+
+
+def test_cached_embeddings_retrieves_the_closest_passage(cache_dir):
+    corpus = ["roaming abroad daily fee", "extend package before expiry", "weather forecast"]
+    encoder = CountingEncoder()
+    retriever = CachedEmbeddings(corpus, encoder, k=1, model_name="model")
+
+    assert retriever("extend my package").passages == ["extend package before expiry"]
+    # Only the corpus and the query were encoded
+    assert encoder.calls == 2
+
+
+def test_padded_ann_candidates_are_dropped_not_duplicated(cache_dir):
+    corpus = ["roaming abroad daily fee", "extend package before expiry", "weather forecast"]
+    retriever = CachedEmbeddings(corpus, fake_encode, k=3, model_name="model")
+    query = retriever._normalize(fake_encode(["extend package"]))
+
+    # What an HNSW search that found only two neighbours returns
+    [(passages, indices)] = retriever._rerank_and_predict(query, np.array([[1, 0, -1, -1]]))
+
+    assert passages == ["extend package before expiry", "roaming abroad daily fee"]
+    assert indices == [1, 0]
@@ -0,0 +1,42 @@
+"""
+run_module: results, failures and concurrent calls on the shared executor
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.services import run_module
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_returns_the_module_result():
+    def module(question):
+        return f"answer to {question}"
+
+    assert await run_module(module, question="a") == "answer to a"
+
+
+async def test_failures_reach_the_caller():
+    def module(question):
+        raise ValueError(question)
+
+    with pytest.raises(ValueError, match="boom"):
+        await run_module(module, question="boom")
+
+
+async def test_calls_run_side_by_side_off_the_loop():
+    both_started = threading.Barrier(2, timeout=5)
+    threads = []
+
+    def module(question):
+        threads.append(threading.current_thread().name)
+        # Would time out if the second call waited for the first to finish
+        both_started.wait()
+        return question
+
+    results = await asyncio.gather(run_module(module, question=1), run_module(module, question=2))
+
+    assert results == [1, 2]
+    assert all(name.startswith("dspy-module") for name in threads)
@@ -0,0 +1,105 @@
+"""
+/api/predict: picking up artifacts trained by another worker, training failures and bootstrapping
+"""
+import os
+import threading
+
+import dspy
+import litellm
+import pytest
+
+from app.api import finetuning
+from app.services import ParallelBootstrapFewShot
+
+
+@pytest.fixture
+def artifact(monkeypatch):
+    monkeypatch.setattr(finetuning, "optimized_qa", None)
+    monkeypatch.setattr(finetuning, "_loaded_version", None)
+    yield finetuning.QA_ARTIFACT_PATH
+    finetuning.QA_ARTIFACT_PATH.unlink(missing_ok=True)
+
+
+def save_from_another_worker(path, answer):
+    """Write an artifact the way save_optimized_model does, without touching this worker's globals"""
+    program = dspy.Predict(finetuning.QA)
+    program.demos = [dspy.Example(question="demo", answer=answer)]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name("other-worker.tmp.json")
+    program.save(str(tmp_path))
+    os.replace(tmp_path, path)
+
+
+def test_untrained_model_is_rejected(client, fake_llm, artifact):
+    response = client.post("/api/predict", json={"question": "roaming?"})
+
+    assert response.status_code == 400
+
+
+def test_new_artifact_is_loaded_and_not_served_stale_answers(client, fake_llm, artifact):
+    save_from_another_worker(artifact, "first")
+    first = client.post("/api/predict", json={"question": "what is roaming"})
+
+    assert first.status_code == 200
+    assert first.json()["answer"] == "answer to what is roaming"
+    assert finetuning.optimized_qa.demos[0]["answer"] == "first"
+
+    # Cached for this version
+    client.post("/api/predict", json={"question": "what is roaming"})
+    assert fake_llm.sync_questions == ["what is roaming"]
+
+    save_from_another_worker(artifact, "second")
+    client.post("/api/predict", json={"question": "what is roaming"})
+
+    assert finetuning.optimized_qa.demos[0]["answer"] == "second"
+    assert fake_llm.sync_questions == ["what is roaming", "what is roaming"]
+
+
+def test_failed_save_keeps_serving_the_loaded_program(artifact, monkeypatch):
+    loaded = dspy.Predict(finetuning.QA)
+    monkeypatch.setattr(finetuning, "optimized_qa", loaded)
+    monkeypatch.setattr(finetuning, "_loaded_version", "loaded")
+    monkeypatch.setattr(dspy.BootstrapFewShot, "compile", lambda self, student, trainset: student)
+
+    def broken_save(program):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(finetuning, "save_optimized_model", broken_save)
+    trainlist = [finetuning._make_example("q", "a")]
+
+    finetuning._run_training("job", trainlist, ["data.csv"])
+
+    assert finetuning.optimized_qa is loaded
+    assert finetuning._loaded_version == "loaded"
+    assert finetuning._training_jobs.get("job")["status"] == "failed"
+
+
+def test_extra_csv_columns_are_ignored(tmp_path):
+    csv_file = tmp_path / "wide.csv"
+    csv_file.write_text("what is roaming,using your plan abroad,note\nhow do I extend it,dial *100#,note\n")
+
+    frame = finetuning._read_csv(csv_file)
+
+    assert frame["question"].tolist() == ["what is roaming", "how do I extend it"]
+    assert frame["answer"].tolist() == ["using your plan abroad", "dial *100#"]
+
+
+def test_bootstrapping_traces_examples_concurrently(client, fake_llm, monkeypatch):
+    # Every teacher call waits for three others, so a sequential compile would fail them all
+    barrier = threading.Barrier(4, timeout=5)
+    completion = litellm.completion
+
+    def concurrent_completion(**kwargs):
+        barrier.wait()
+        return completion(**kwargs)
+
+    monkeypatch.setattr(litellm, "completion", concurrent_completion)
+    trainlist = [finetuning._make_example(f"bootstrap question {i}", f"label {i}") for i in range(6)]
+    optimizer = ParallelBootstrapFewShot(num_threads=4, max_bootstrapped_demos=4, max_labeled_demos=6)
+
+    demos = optimizer.compile(dspy.Predict(finetuning.QA), trainset=trainlist).demos
+
+    assert [demo.question for demo in demos[:4]] == [f"bootstrap question {i}" for i in range(4)]
+    assert all(demo.augmented for demo in demos[:4])
+    assert demos[0].answer == "answer to bootstrap question 0"
+    assert sorted(demo.question for demo in demos[4:]) == ["bootstrap question 4", "bootstrap question 5"]
@@ -0,0 +1,56 @@
+"""
+KeywordIndex scoring and top-k selection
+"""
+import random
+
+import numpy as np
+
+from app.services import KeywordIndex
+from app.services.keyword_index import tokenize, top_k_indices
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert tokenize("Roaming, abroad! Extend?") == ["roaming", "abroad", "extend"]
+
+
+def test_more_query_term_occurrences_rank_higher():
+    index = KeywordIndex(["roaming roaming abroad", "roaming plan", "weather today"])
+
+    assert index.search("Roaming", top_k=3) == ["roaming roaming abroad", "roaming plan"]
+
+
+def test_no_matching_token_returns_nothing():
+    assert KeywordIndex(["roaming plan"]).search("weather") == []
+
+
+def test_bm25_prefers_rare_terms_over_repeated_common_ones():
+    corpus = ["roaming roaming roaming", "roaming extend", "roaming plan"]
+
+    assert KeywordIndex(corpus).search("roaming extend", top_k=1) == ["roaming extend"]
+
+
+def test_bm25_penalizes_long_documents():
+    corpus = ["extend offer", "extend " + " ".join(f"filler{i}" for i in range(30))]
+
+    assert KeywordIndex(corpus).search("extend", top_k=2) == corpus
+
+
+def test_ties_keep_corpus_order():
+    corpus = ["plan b", "plan a", "plan c"]
+
+    assert KeywordIndex(corpus).search("plan", top_k=2) == ["plan b", "plan a"]
+
+
+def test_top_k_indices_matches_a_stable_descending_sort():
+    rng = random.Random(0)
+    for _ in range(500):
+        scores = [rng.randint(0, 3) for _ in range(rng.randint(0, 12))]
+        k = rng.randint(0, 14)
+        expected = sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+
+        assert list(top_k_indices(np.array(scores), k)) == expected
+
+
+def test_top_k_indices_handles_empty_requests():
+    assert top_k_indices(np.array([3, 1]), 0).size == 0
+    assert top_k_indices(np.array([]), 3).size == 0
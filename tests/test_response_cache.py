@@ -0,0 +1,88 @@
+"""
+Exact-match response cache: keys, tags and expiry
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import dspy
+
+from app.services import ResponseCache, response_key
+
+# app.services re-exports the shared instance under the module's name
+response_cache_module = sys.modules["app.services.response_cache"]
+
+
+def test_key_ignores_argument_order():
+    assert response_key("question", None, None, question="q", context="c") == response_key(
+        "question", None, None, context="c", question="q"
+    )
+
+
+def test_key_depends_on_endpoint_inputs_and_model(monkeypatch):
+    key = response_key("question", None, None, question="q")
+
+    assert response_key("reasoning", None, None, question="q") != key
+    assert response_key("question", None, None, question="other") != key
+    monkeypatch.setattr(response_cache_module, "config", SimpleNamespace(DEFAULT_MODEL="another/model"))
+    assert response_key("question", None, None, question="q") != key
+
+
+def test_key_depends_on_the_rendered_signature():
+    class Ordered(dspy.Signature):
+        """Answer the question"""
+        context = dspy.InputField()
+        question = dspy.InputField()
+        answer = dspy.OutputField()
+
+    class Reordered(dspy.Signature):
+        """Answer the question"""
+        question = dspy.InputField()
+        context = dspy.InputField()
+        answer = dspy.OutputField()
+
+    key = response_key("question", dspy.Predict(Ordered), None, question="q")
+
+    assert response_key("question", dspy.Predict(Ordered), None, question="q") == key
+    assert response_key("question", dspy.Predict(Reordered), None, question="q") != key
+    reworded = Ordered.with_instructions("Answer the question briefly")
+    assert response_key("question", dspy.Predict(reworded), None, question="q") != key
+
+
+def test_key_depends_on_lm_settings_but_not_the_api_key():
+    key = response_key("question", None, dspy.LM("groq/model", temperature=0.7, api_key="a"), question="q")
+
+    assert response_key("question", None, dspy.LM("groq/model", temperature=0.7, api_key="b"), question="q") == key
+    assert response_key("question", None, dspy.LM("groq/model", temperature=0.0, api_key="a"), question="q") != key
+    assert response_key(
+        "question", None, dspy.LM("groq/model", temperature=0.7, max_tokens=50, api_key="a"), question="q"
+    ) != key
+
+
+def test_get_set_and_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), size_limit=1 << 20)
+    cache.set("key", ("answer", "reasoning"), tag="reasoning")
+
+    assert cache.get("key") == ("answer", "reasoning")
+    assert cache.get("missing") is None
+
+
+def test_evict_drops_only_the_tagged_endpoint(tmp_path):
+    cache = ResponseCache(str(tmp_path), size_limit=1 << 20)
+    cache.set("p1", "old answer", tag="predict")
+    cache.set("p2", "old answer", tag="predict")
+    cache.set("q1", "answer", tag="question")
+
+    cache.evict("predict")
+
+    assert cache.get("p1") is None
+    assert cache.get("p2") is None
+    assert cache.get("q1") == "answer"
+
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), size_limit=1 << 20, ttl=0.05)
+    cache.set("key", "answer", tag="question")
+    time.sleep(0.1)
+
+    assert cache.get("key") is None
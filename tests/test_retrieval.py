@@ -0,0 +1,93 @@
+"""
+Document chunking and reloading for the RAG corpus
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from docx import Document
+
+from app.api import retrieval
+from app.api.retrieval import read_docx_with_chunks
+from app.services import KeywordIndex
+
+
+@pytest.fixture
+def docx_path(tmp_path):
+    document = Document()
+    document.add_paragraph(" ".join(f"w{i}" for i in range(10)))
+    path = tmp_path / "doc.docx"
+    document.save(path)
+    return path
+
+
+def test_windows_overlap_by_the_requested_words(docx_path):
+    chunks = list(read_docx_with_chunks(docx_path, chunk_size=4, overlap=1))
+
+    assert chunks == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9", "w9"]
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(4, 4), (4, 6), (0, 0), (4, -1)])
+def test_windows_that_cannot_advance_are_rejected(docx_path, chunk_size, overlap):
+    with pytest.raises(ValueError):
+        list(read_docx_with_chunks(docx_path, chunk_size=chunk_size, overlap=overlap))
+
+
+def test_reload_builds_the_retriever_stack_off_the_loop(client, monkeypatch):
+    built_on_loop = []
+
+    def keyword_index(corpus):
+        try:
+            asyncio.get_running_loop()
+            built_on_loop.append(True)
+        except RuntimeError:
+            built_on_loop.append(False)
+        return KeywordIndex(corpus)
+
+    monkeypatch.setattr(retrieval, "KeywordIndex", keyword_index)
+    old_rag = retrieval.rag_hybrid
+
+    response = client.post("/rag/reload")
+
+    assert response.status_code == 200
+    assert built_on_loop == [False]
+    assert retrieval.rag_hybrid is not old_rag
+    assert retrieval.rag_hybrid.semantic_retrieve is retrieval.retriever
+    assert client.get("/rag/status").json()["docx_chunk_count"] == len(retrieval.corpus) > 0
+
+
+class FakeRAG:
+    """Answers with a fixed label once `release` is set"""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, question):
+        self.started.set()
+        self.release.wait(5)
+        return SimpleNamespace(answer=f"{self.label} answer")
+
+
+def test_answer_from_before_a_reload_is_not_served_after_it(client, monkeypatch):
+    old_rag, new_rag = FakeRAG("old"), FakeRAG("new")
+    new_rag.release.set()
+    # The reload replaces all three; monkeypatch puts the real ones back afterwards
+    for name, value in (("corpus", retrieval.corpus), ("retriever", retrieval.retriever), ("rag_hybrid", old_rag)):
+        monkeypatch.setattr(retrieval, name, value)
+    monkeypatch.setattr(retrieval, "_build_rag", lambda: (["chunk"], None, new_rag))
+    in_flight = []
+
+    query = threading.Thread(target=lambda: in_flight.append(client.post("/rag", json={"query": "reload race"})))
+    query.start()
+    try:
+        assert old_rag.started.wait(5)
+        assert client.post("/rag/reload").status_code == 200
+    finally:
+        old_rag.release.set()
+        query.join(10)
+
+    assert in_flight[0].json()["response"] == "old answer"
+    assert client.post("/rag", json={"query": "reload race"}).json()["response"] == "new answer"
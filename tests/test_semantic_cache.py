@@ -0,0 +1,92 @@
+"""
+SemanticCache hits, misses and eviction
+"""
+import numpy as np
+import pytest
+
+from app.api import qa
+from app.services import SemanticCache
+
+
+def unit(*components):
+    vector = np.array(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def make_cache(**kwargs):
+    return SemanticCache(lambda text: [1.0, 0.0], **kwargs)
+
+
+def similar(cosine):
+    """Unit vector at the given cosine similarity to (1, 0)"""
+    return unit(cosine, np.sqrt(1 - cosine ** 2))
+
+
+def test_empty_cache_misses():
+    assert make_cache().get(unit(1, 0)) is None
+
+
+def test_hit_only_at_or_above_the_threshold():
+    cache = make_cache(threshold=0.9)
+    cache.add(unit(1, 0), "cached")
+
+    assert cache.get(similar(0.95)) == "cached"
+    assert cache.get(similar(0.85)) is None
+
+
+def test_most_similar_entry_wins():
+    cache = make_cache(threshold=0.5)
+    cache.add(similar(0.6), "far")
+    cache.add(similar(0.99), "near")
+
+    assert cache.get(unit(1, 0)) == "near"
+
+
+def test_oldest_entry_is_overwritten_when_full():
+    cache = make_cache(threshold=0.99, max_entries=2)
+    cache.add(unit(1, 0), "first")
+    cache.add(unit(0, 1), "second")
+    cache.add(unit(-1, 0), "third")
+
+    assert cache.get(unit(1, 0)) is None
+    assert cache.get(unit(0, 1)) == "second"
+    assert cache.get(unit(-1, 0)) == "third"
+
+
+def test_clear_drops_everything():
+    cache = make_cache()
+    cache.add(unit(1, 0), "cached")
+    cache.clear()
+
+    assert cache.get(unit(1, 0)) is None
+
+
+def test_encode_returns_a_flat_float32_vector():
+    vector = SemanticCache(lambda text: [[1, 2, 3]]).encode("query")
+
+    assert vector.shape == (3,)
+    assert vector.dtype == np.float32
+
+
+@pytest.mark.parametrize("endpoint, cache_name, cached", [
+    ("/question", "_question_cache", "answer to a paraphrase"),
+    ("/reasoning", "_reasoning_cache", ("answer to a paraphrase", "thinking about a paraphrase")),
+])
+def test_a_semantic_hit_is_not_stored_as_the_exact_answer(client, fake_llm, monkeypatch, endpoint, cache_name, cached):
+    semantic = True
+
+    async def cache_vector(cache, request):
+        return unit(1, 0) if semantic else None
+
+    monkeypatch.setattr(qa, "_cache_vector", cache_vector)
+    monkeypatch.setattr(qa, cache_name, make_cache(threshold=0.9))
+    getattr(qa, cache_name).add(unit(1, 0), cached)
+    question = f"near twin of a cached question for {endpoint}"
+
+    first = client.post(endpoint, json={"question": question})
+    semantic = False
+    second = client.post(endpoint, json={"question": question})
+
+    assert first.json()["answer"] == "answer to a paraphrase"
+    # The repeat went to the LM instead of replaying the paraphrase's answer
+    assert second.json()["answer"] == f"answer to {question}"
@@ -0,0 +1,59 @@
+"""
+Stream event encodings and in-band errors
+"""
+import anyio
+import dspy
+import orjson
+import pytest
+
+from app.services import final_event, ndjson, sse, stream_events
+
+pytestmark = pytest.mark.asyncio
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+class Echo(dspy.Module):
+    def forward(self, question):
+        return dspy.Prediction(answer=question)
+
+
+class Broken(dspy.Module):
+    def forward(self, question):
+        raise RuntimeError("provider down")
+
+
+async def test_ndjson_and_sse_framing():
+    event = {"done": True, "prediction": {"answer": "a"}}
+
+    assert await collect(ndjson(final_event(answer="a"))) == [orjson.dumps(event) + b"\n"]
+    assert await collect(sse(final_event(answer="a"))) == [b"data: " + orjson.dumps(event) + b"\n\n"]
+
+
+async def test_prediction_is_the_last_event():
+    events = await collect(stream_events(Echo(), (), question="hi"))
+
+    assert events == [{"done": True, "prediction": {"answer": "hi"}}]
+
+
+async def test_failure_is_reported_in_band():
+    events = await collect(stream_events(Broken(), (), question="hi"))
+
+    assert events == [{"done": True, "error": "provider down"}]
+
+
+async def test_streams_do_not_wait_on_the_default_thread_limiter():
+    default = anyio.to_thread.current_default_thread_limiter()
+    total = default.total_tokens
+    default.total_tokens = 1
+    try:
+        # A long job holds the only default token, as /train does
+        async with default:
+            with anyio.fail_after(5):
+                events = await collect(stream_events(Echo(), (), question="hi"))
+    finally:
+        default.total_tokens = total
+
+    assert events == [{"done": True, "prediction": {"answer": "hi"}}]
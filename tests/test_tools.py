@@ -0,0 +1,90 @@
+"""
+Tools: per-call jokes, cached weather lookups and the tool getters
+"""
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from cachetools import TTLCache
+
+from app.tools import get_default_tools, joke_tool, lookup_joke, lookup_weather, weather_tool
+from app.tools.tool_manager import get_extended_tools, get_tools_by_category
+
+
+class FakeSession:
+    """Stands in for a pooled requests.Session, answering each GET with the next payload"""
+
+    def __init__(self, payloads):
+        self.payloads = iter(payloads)
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return SimpleNamespace(content=orjson.dumps(next(self.payloads)))
+
+
+@pytest.fixture
+def weather_cache(monkeypatch):
+    monkeypatch.setattr(weather_tool, "_weather_cache", TTLCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(weather_tool, "_weather_errors", TTLCache(maxsize=8, ttl=60))
+
+
+def test_each_joke_request_fetches_a_new_joke(monkeypatch):
+    session = FakeSession({"type": "single", "joke": f"joke {i}"} for i in range(3))
+    monkeypatch.setattr(joke_tool, "_SESSION", session)
+
+    jokes = [lookup_joke() for _ in range(3)]
+
+    assert jokes == [("joke 0", True), ("joke 1", True), ("joke 2", True)]
+    assert len(session.urls) == 3
+
+
+def test_joke_api_error_is_reported_as_a_failure(monkeypatch):
+    monkeypatch.setattr(joke_tool, "_SESSION", FakeSession([{"error": True}]))
+
+    assert lookup_joke() == ("Sorry, I couldn't fetch a joke.", False)
+
+
+@pytest.mark.parametrize("payload", [
+    {"type": "single"},
+    {"type": "single", "joke": None},
+    {"type": "twopart", "setup": "Why?"},
+    {"type": "twopart", "delivery": "Because."},
+])
+def test_joke_without_text_is_reported_as_a_failure(monkeypatch, payload):
+    monkeypatch.setattr(joke_tool, "_SESSION", FakeSession([payload]))
+
+    assert lookup_joke() == ("Sorry, I couldn't fetch a joke.", False)
+
+
+def test_weather_lookups_for_a_city_share_one_fetch(monkeypatch, weather_cache):
+    reading = {"cod": 200, "main": {"temp": 21}, "weather": [{"description": "clear sky"}]}
+    session = FakeSession([reading, reading])
+    monkeypatch.setattr(weather_tool, "_SESSION", session)
+
+    paris = [lookup_weather("Paris"), lookup_weather("paris ")]
+    rome = lookup_weather("Rome")
+
+    assert paris[0] == paris[1] == ("The weather in Paris is 21°C with clear sky.", True)
+    assert rome == ("The weather in Rome is 21°C with clear sky.", True)
+    assert len(session.urls) == 2
+
+
+def test_failed_weather_lookup_is_cached_as_a_failure(monkeypatch, weather_cache):
+    session = FakeSession([{"cod": "404", "message": "city not found"}])
+    monkeypatch.setattr(weather_tool, "_SESSION", session)
+
+    assert lookup_weather("Atlantis") == lookup_weather("Atlantis") == (
+        "Sorry, I couldn't fetch the weather for Atlantis.", False
+    )
+    assert len(session.urls) == 1
+
+
+def test_tool_getters_return_fresh_lists():
+    for getter, args in ((get_default_tools, ()), (get_extended_tools, ()), (get_tools_by_category, ("time",))):
+        tools = getter(*args)
+        assert isinstance(tools, list)
+        tools.clear()
+        assert getter(*args)
+
+    assert get_tools_by_category("unknown") == []